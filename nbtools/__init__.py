@@ -12,7 +12,17 @@ class NetboxToolsConfig(PluginConfig):
     license = "MIT"
     base_url = "nbtools"
     required_settings = []
-    default_settings = {}
+    default_settings = {
+        "graph_max_workers": 8,
+        "graph_max_retries": 5,
+        "overlap_engine": "python",
+    }
     top_level_menu = True
 
+    def ready(self):
+        super().ready()
+        from . import signals  # noqa: F401
+        # Registers the scheduled system jobs
+        from . import jobs  # noqa: F401
+
 config = NetboxToolsConfig
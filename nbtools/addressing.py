@@ -0,0 +1,265 @@
+"""
+Address allocation helpers for NetBox Tools.
+Works on integer address ranges, so the cost follows the number of assigned addresses
+rather than the size of the prefix, for IPv4 and IPv6 alike.
+"""
+
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import deque
+from ipaddress import ip_address, ip_network
+from itertools import groupby
+
+from django.db import connection
+
+from ipam.models import IPAddress, Prefix
+from netbox.plugins import get_plugin_config
+
+# Host offsets used when picking the next free address. The first host is kept for the
+# gateway; Azure additionally reserves the next few addresses of every subnet.
+GATEWAY_OFFSET = 1
+AZURE_RESERVED_OFFSET = 5
+# Prefix statuses left out of overlap checks
+OVERLAP_IGNORED_STATUSES = ("container", "deprecated")
+
+
+def host_range(network):
+    """
+    Return the (first, last) integer bounds of network.hosts().
+    """
+    first = int(network.network_address)
+    last = int(network.broadcast_address)
+    # /31, /32, /127 and /128 use every address
+    if network.num_addresses <= 2:
+        return first, last
+    if network.version == 4:
+        return first + 1, last - 1
+    return first + 1, last
+
+
+class PrefixAllocation:
+    """
+    Assigned addresses of one prefix, held as a sorted list of integers.
+    """
+
+    def __init__(self, prefix, assigned, presorted=False):
+        self.network = ip_network(prefix)
+        self.assigned = assigned if presorted else sorted(set(assigned))
+
+    @classmethod
+    def for_prefix(cls, prefix, queryset=None):
+        """
+        Load the addresses assigned inside `prefix`. A Prefix object limits the lookup
+        to its VRF; a prefix string searches `queryset` (all addresses by default).
+        """
+        if queryset is None:
+            queryset = IPAddress.objects.all()
+            if isinstance(prefix, Prefix):
+                queryset = queryset.filter(vrf_id=prefix.vrf_id)
+        prefix = str(getattr(prefix, "prefix", prefix))
+        addresses = queryset.filter(address__net_host_contained=prefix).values_list("address", flat=True)
+        return cls(prefix, (int(address.ip) for address in addresses))
+
+    @property
+    def total(self):
+        return self.network.num_addresses
+
+    @property
+    def available(self):
+        return self.total - len(self.assigned)
+
+    def first_free(self, offset=0):
+        """
+        Return the first host at or after host index `offset` that is not assigned,
+        or None when the prefix is exhausted.
+        """
+        first, last = host_range(self.network)
+        candidate = first + offset
+        # Walk the assigned run starting at the candidate until the first gap
+        index = bisect_left(self.assigned, candidate)
+        while index < len(self.assigned) and self.assigned[index] == candidate:
+            candidate += 1
+            index += 1
+        if candidate > last:
+            return None
+        return ip_address(candidate)
+
+
+ASSIGNED_FROM_QUERY = """
+    SELECT host(h) FROM (
+        SELECT DISTINCT host(address)::inet AS h
+        FROM ipam_ipaddress
+        WHERE vrf_id IS NOT DISTINCT FROM %(vrf)s
+            AND host(address)::inet <<= %(prefix)s::cidr
+            AND host(address)::inet >= %(start)s::inet
+    ) hosts
+    ORDER BY h
+    LIMIT %(limit)s
+"""
+
+
+def first_free_from(network, vrf_id, start, chunk_size=1000):
+    """
+    Return the first unassigned host of `network` at or after the integer address `start`.
+    Reads only the run of assigned addresses starting there, a chunk at a time.
+    """
+    _, last = host_range(network)
+    candidate = start
+    with connection.cursor() as cursor:
+        while candidate <= last:
+            params = {"vrf": vrf_id, "prefix": str(network), "start": str(ip_address(candidate)), "limit": chunk_size}
+            cursor.execute(ASSIGNED_FROM_QUERY, params)
+            hosts = [int(ip_address(host)) for host, in cursor.fetchall()]
+            for host in hosts:
+                if host != candidate:
+                    return ip_address(candidate)
+                candidate += 1
+            if len(hosts) < chunk_size:
+                break
+    return ip_address(candidate) if candidate <= last else None
+
+
+def vrf_allocations(vrf_id):
+    """
+    Return [(prefix, PrefixAllocation), ...] for every prefix of a VRF, using one query
+    for the prefixes and one for the addresses.
+
+    Addresses are sorted once per address family and each prefix takes the slice
+    between its first and last address, so nested prefixes all see their addresses.
+    """
+    assigned = {4: [], 6: []}
+    for address in IPAddress.objects.filter(vrf_id=vrf_id).values_list("address", flat=True):
+        assigned[address.version].append(int(address.ip))
+    for version, values in assigned.items():
+        assigned[version] = sorted(set(values))
+
+    allocations = []
+    for prefix in Prefix.objects.filter(vrf_id=vrf_id).order_by("prefix"):
+        network = ip_network(str(prefix.prefix))
+        values = assigned[network.version]
+        start = bisect_left(values, int(network.network_address))
+        end = bisect_right(values, int(network.broadcast_address))
+        allocations.append((prefix, PrefixAllocation(network, values[start:end], presorted=True)))
+    return allocations
+
+
+def sweep_overlaps(primary, secondary):
+    """
+    Yield (primary key, [secondary key, ...]) for every primary network, in input order.
+
+    Both arguments are iterables of (key, network) sorted by address family, start address
+    and then size, largest first, which is PostgreSQL's order for cidr values. CIDR blocks
+    never partially overlap, so the blocks open at any point of a sweep over both inputs
+    form a nested chain per side. When a block starts, every block still open on the other
+    side contains its start address and overlaps it. A primary network is yielded as soon
+    as the sweep passes its end and every earlier one has been yielded, so only networks
+    still open are held in memory. Runs in O(n + m + k).
+    """
+    def events(networks, side):
+        for key, network in networks:
+            yield network.version, int(network.network_address), -int(network.broadcast_address), side, key
+
+    # Outer blocks first on equal starts, so they are open when the inner ones arrive
+    merged = heapq.merge(events(primary, 0), events(secondary, 1), key=lambda event: event[:4])
+    open_blocks = ([], [])
+    pending = deque()
+    version = None
+    for event_version, start, negative_end, side, key in merged:
+        if event_version != version:
+            version = event_version
+            open_blocks = ([], [])
+            while pending:
+                _, done, others = pending.popleft()
+                yield done, others
+        for stack in open_blocks:
+            while stack and stack[-1][0] < start:
+                stack.pop()
+        while pending and pending[0][0] < start:
+            _, done, others = pending.popleft()
+            yield done, others
+
+        if side == 0:
+            row = [-negative_end, key, [other for _, other in open_blocks[1]]]
+            pending.append(row)
+            open_blocks[0].append((-negative_end, row))
+        else:
+            for _, row in open_blocks[0]:
+                row[2].append(key)
+            open_blocks[1].append((-negative_end, key))
+
+    for _, done, others in pending:
+        yield done, others
+
+
+def prefix_overlaps(primary_id, secondary_id, engine=None):
+    """
+    Yield ((prefix, status), [(prefix, status), ...]) for every checked prefix of the
+    primary VRF, with the secondary VRF prefixes it overlaps, in prefix order.
+
+    The engine comes from the overlap_engine plugin setting: "python" sweeps both VRFs
+    as they stream from the database, "database" lets PostgreSQL join them with the inet
+    overlap operator.
+    """
+    engine = engine or get_plugin_config("nbtools", "overlap_engine")
+    if engine == "database":
+        return _database_overlaps(primary_id, secondary_id)
+    return _sweep_overlaps(primary_id, secondary_id)
+
+
+def _sweep_overlaps(primary_id, secondary_id):
+    # Both VRFs are streamed in prefix order; rows come out as the sweep passes them
+    def prefixes(vrf_id):
+        queryset = (
+            Prefix.objects.filter(vrf_id=vrf_id).exclude(status__in=OVERLAP_IGNORED_STATUSES)
+            .order_by("prefix", "pk").values_list("prefix", "status")
+        )
+        for prefix, status in queryset.iterator(chunk_size=2000):
+            yield (prefix, status), ip_network(prefix)
+
+    yield from sweep_overlaps(prefixes(primary_id), prefixes(secondary_id))
+
+
+OVERLAP_QUERY = """
+    SELECT p.id, p.prefix, p.status, s.prefix, s.status
+    FROM ipam_prefix p
+    LEFT JOIN ipam_prefix s
+        ON s.vrf_id = %(secondary)s
+        AND s.status <> ALL(%(ignored)s)
+        AND s.prefix && p.prefix
+    WHERE p.vrf_id = %(primary)s
+        AND p.status <> ALL(%(ignored)s)
+    ORDER BY p.prefix, p.id, s.prefix, s.id
+"""
+
+
+def _database_overlaps(primary_id, secondary_id):
+    # Only the joined pairs cross the wire; && can use the GiST index from migration 0010
+    params = {"primary": primary_id, "secondary": secondary_id, "ignored": list(OVERLAP_IGNORED_STATUSES)}
+    with connection.cursor() as cursor:
+        cursor.execute(OVERLAP_QUERY, params)
+        rows = iter(lambda: cursor.fetchmany(2000), [])
+        pairs = (row for chunk in rows for row in chunk)
+        for (_, prefix, status), group in groupby(pairs, key=lambda row: row[:3]):
+            yield (prefix, status), [(other, other_status) for *_, other, other_status in group if other is not None]
+
+
+def overlapping_pairs(blocks):
+    """
+    Yield (key, other key) for every overlapping pair among `blocks`, an iterable of
+    (key, network), using the same sweep as sweep_overlaps() over a single set.
+    """
+    events = sorted(
+        ((network.version, int(network.network_address), -int(network.broadcast_address), key) for key, network in blocks),
+        key=lambda event: event[:3],
+    )
+    stack = []
+    version = None
+    for event_version, start, negative_end, key in events:
+        if event_version != version:
+            version = event_version
+            stack = []
+        while stack and stack[-1][0] < start:
+            stack.pop()
+        for _, other in stack:
+            yield other, key
+        stack.append((-negative_end, key))
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from dcim.api.serializers import DeviceSerializer
+from virtualization.api.serializers import VirtualMachineSerializer
+
+from ..models import DocumentationBinding
+
+
+class DocumentationBindingSerializer(serializers.ModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name="plugins-api:nbtools-api:documentationbinding-detail")
+    device = DeviceSerializer(nested=True, read_only=True)
+    virtual_machine = VirtualMachineSerializer(nested=True, read_only=True)
+
+    class Meta:
+        model = DocumentationBinding
+        fields = [
+            "id", "url", "server_name", "file_name", "version", "file_type", "application_name",
+            "category", "sharepoint_url", "item_id", "device", "virtual_machine", "last_synced",
+        ]
@@ -0,0 +1,10 @@
+from netbox.api.routers import NetBoxRouter
+
+from . import views
+
+app_name = "nbtools-api"
+
+router = NetBoxRouter()
+router.register("documentation-bindings", views.DocumentationBindingViewSet)
+
+urlpatterns = router.urls
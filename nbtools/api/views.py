@@ -0,0 +1,23 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.viewsets import ReadOnlyModelViewSet
+
+from netbox.api.authentication import TokenPermissions
+
+from ..filtersets import DocumentationBindingFilterSet
+from ..models import DocumentationBinding
+from .serializers import DocumentationBindingSerializer
+
+
+class DocumentationBindingPagination(CursorPagination):
+    # Keyset pagination on the primary key, page cost does not grow with depth
+    ordering = "pk"
+    page_size_query_param = "limit"
+    max_page_size = 1000
+
+
+class DocumentationBindingViewSet(ReadOnlyModelViewSet):
+    queryset = DocumentationBinding.objects.current().select_related("device", "virtual_machine")
+    serializer_class = DocumentationBindingSerializer
+    filterset_class = DocumentationBindingFilterSet
+    pagination_class = DocumentationBindingPagination
+    permission_classes = [TokenPermissions]
@@ -0,0 +1,49 @@
+"""
+Documentation panel cache for NetBox Tools.
+Keeps the grouped documentation shown on Device and VM pages in the Django cache, keyed on
+the published sync generation plus a revision that changes whenever bindings do.
+"""
+
+import time
+
+from django.core.cache import cache
+
+from .models import SharePointConfig, DocumentationBinding
+
+DOCUMENTATION_CACHE_TIMEOUT = 60 * 60 * 24
+DOCUMENTATION_VERSION_KEY = "nbtools:documentation:version"
+PANEL_FIELDS = ("category", "file_name", "version", "file_type", "application_name", "sharepoint_url")
+
+
+def documentation_cache_version():
+    """
+    Return "<generation>.<revision>". Invalidation drops the stored value, so the next
+    reader picks up the generation published by the sync that caused it.
+    """
+    version = cache.get(DOCUMENTATION_VERSION_KEY)
+    if version is None:
+        generation = SharePointConfig.objects.order_by("pk").values_list("current_generation", flat=True).first()
+        version = f"{generation or 0}.{time.time_ns()}"
+        # Concurrent readers settle on whichever value was stored first
+        if not cache.add(DOCUMENTATION_VERSION_KEY, version, DOCUMENTATION_CACHE_TIMEOUT):
+            version = cache.get(DOCUMENTATION_VERSION_KEY, version)
+    return version
+
+
+def invalidate_documentation_cache():
+    cache.delete(DOCUMENTATION_VERSION_KEY)
+
+
+def get_grouped_documents(field, obj):
+    """
+    Return {category: [document, ...]} for the bindings whose `field` points at `obj`.
+    """
+    cache_key = f"nbtools:documentation:{documentation_cache_version()}:{field}:{obj.pk}"
+    grouped_docs = cache.get(cache_key)
+    if grouped_docs is None:
+        grouped_docs = {}
+        documents = DocumentationBinding.objects.current().filter(**{field: obj}).order_by("category", "file_name")
+        for doc in documents.values(*PANEL_FIELDS):
+            grouped_docs.setdefault(doc["category"], []).append(doc)
+        cache.set(cache_key, grouped_docs, DOCUMENTATION_CACHE_TIMEOUT)
+    return grouped_docs
@@ -0,0 +1,270 @@
+"""
+Offline Microsoft Graph stand-in for NetBox Tools.
+Serves a synthetic SharePoint library through a requests transport adapter, so the
+SharePoint sync can be exercised and measured without a tenant or network access.
+"""
+
+import json
+import random
+import threading
+import time
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .graph import GRAPH_BASE_URL
+
+FAKE_HOSTNAME = "contoso.sharepoint.com"
+FAKE_SITE_URL = f"https://{FAKE_HOSTNAME}/sites/docs"
+FAKE_SITE_ID = "contoso.sharepoint.com,site,docs"
+FAKE_DRIVE_ID = "drive-documents"
+PAGE_SIZE = 200
+
+
+class SyntheticLibrary:
+    """
+    A generated document library of `categories` × `subfolders` × `files`.
+
+    The first two subfolders of every category are "Application" and "Server" and hold
+    files following the naming convention; any further subfolders are ignored by the sync.
+    mutate() records changes that are replayed through the delta endpoint.
+    """
+
+    def __init__(self, categories=10, subfolders=2, files=10, seed=0):
+        self.random = random.Random(seed)
+        self.items = {}
+        self.children = {}
+        self.paths = {}
+        self.changes = []
+        self.version = 0
+        self.root_id = "root"
+        self._add_folder(self.root_id, "root", None)
+
+        docs_id = self._add_folder("folder-docs", "Docs", self.root_id)
+        for c in range(categories):
+            category_name = f"Category{c:03d}"
+            category_id = self._add_folder(f"cat-{c}", category_name, docs_id)
+            self.paths[f"Docs/{category_name}"] = category_id
+
+            for s in range(subfolders):
+                subfolder_name = ["Application", "Server"][s] if s < 2 else f"Misc{s}"
+                subfolder_id = self._add_folder(f"cat-{c}-sub-{s}", subfolder_name, category_id)
+                for f in range(files):
+                    self._add_file(f"file-{c}-{s}-{f}", self._file_name(subfolder_name, c, f), subfolder_id)
+
+    def folder_mappings(self):
+        return {path.rsplit("/", 1)[-1]: path for path in self.paths}
+
+    def _add_folder(self, item_id, name, parent_id):
+        self.items[item_id] = {"id": item_id, "name": name, "parent": parent_id, "folder": {}}
+        self.children[item_id] = []
+        if parent_id:
+            self.children[parent_id].append(item_id)
+        return item_id
+
+    def _add_file(self, item_id, name, parent_id):
+        self.items[item_id] = {"id": item_id, "name": name, "parent": parent_id, "file": {}}
+        self.children[parent_id].append(item_id)
+        return item_id
+
+    def _file_name(self, subfolder_name, category, index, version=0):
+        if subfolder_name == "Application":
+            return f"APP{category}-SRV{category}x{index}-Design_Doc-V1.{version}.{index}.docx"
+        return f"SRV{category}x{index}-Runbook-V1.{version}.{index}.docx"
+
+    def _path(self, item_id):
+        parts = []
+        while item_id and item_id != self.root_id:
+            parts.append(self.items[item_id]["name"])
+            item_id = self.items[item_id]["parent"]
+        return "/".join(reversed(parts))
+
+    def serialize(self, item_id):
+        item = self.items[item_id]
+        data = {
+            "id": item_id,
+            "name": item["name"],
+            "parentReference": {"driveId": FAKE_DRIVE_ID, "id": item["parent"]},
+            "webUrl": f"{FAKE_SITE_URL}/Shared%20Documents/{self._path(item_id)}",
+        }
+        data["folder" if "folder" in item else "file"] = {}
+        return data
+
+    def mutate(self, count):
+        """
+        Rename, delete or add `count` files, one third each.
+        """
+        files = [item_id for item_id, item in self.items.items() if "file" in item]
+        folders = [
+            item_id for item_id, item in self.items.items()
+            if "folder" in item and item["name"] in ("Application", "Server")
+        ]
+        self.version += 1
+
+        for n in range(count):
+            action = n % 3
+            if action == 0 and files:
+                item_id = self.random.choice(files)
+                item = self.items[item_id]
+                item["name"] = item["name"].replace("-V1.", f"-V{self.version + 1}.", 1)
+                self.changes.append((self.version, item_id, False))
+            elif action == 1 and files:
+                item_id = files.pop(self.random.randrange(len(files)))
+                item = self.items.pop(item_id)
+                self.children[item["parent"]].remove(item_id)
+                self.changes.append((self.version, item_id, item["parent"]))
+            elif folders:
+                parent_id = self.random.choice(folders)
+                parent = self.items[parent_id]
+                item_id = f"file-new-{self.version}-{n}"
+                self._add_file(item_id, self._file_name(parent["name"], self.version, 1000 + n), parent_id)
+                self.changes.append((self.version, item_id, False))
+
+    def delta_since(self, version):
+        seen = {}
+        for change_version, item_id, deleted_parent in self.changes:
+            if change_version > version:
+                seen[item_id] = deleted_parent
+        value = []
+        for item_id, deleted_parent in seen.items():
+            if item_id in self.items:
+                value.append(self.serialize(item_id))
+            else:
+                value.append({
+                    "id": item_id,
+                    "deleted": {"state": "deleted"},
+                    "parentReference": {"driveId": FAKE_DRIVE_ID, "id": deleted_parent},
+                })
+        return value
+
+
+class FakeGraphAdapter(BaseAdapter):
+    """
+    requests transport answering the token, site, drive, /children, $batch and delta
+    calls made by the SharePoint sync from a SyntheticLibrary.
+
+    `latency` seconds are added to every HTTP round trip and `throttle_rate` is the
+    share of requests (and $batch sub-requests) answered with 429 and `retry_after`.
+    """
+
+    def __init__(self, library, latency=0.0, throttle_rate=0.0, retry_after=1, seed=0):
+        super().__init__()
+        self.library = library
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "batched_requests": 0, "throttled": 0}
+
+    def _count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+    def _throttle(self):
+        with self.lock:
+            throttled = self.random.random() < self.throttle_rate
+            if throttled:
+                self.counters["throttled"] += 1
+        return throttled
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self._count("requests")
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self._throttle():
+            status, body, headers = 429, {"error": {"code": "TooManyRequests"}}, {"Retry-After": str(self.retry_after)}
+        elif request.url.startswith("https://login.microsoftonline.com/"):
+            status, body, headers = 200, {"access_token": "fake-token", "expires_in": 3599}, {}
+        elif request.method == "POST" and request.url == f"{GRAPH_BASE_URL}/$batch":
+            status, body, headers = 200, self._batch(json.loads(request.body)), {}
+        else:
+            status, body = self.route(request.method, request.url.removeprefix(GRAPH_BASE_URL))
+            headers = {}
+
+        return self._response(request, status, body, headers)
+
+    def _batch(self, payload):
+        responses = []
+        for sub_request in payload.get("requests", []):
+            self._count("batched_requests")
+            if self._throttle():
+                status, body, headers = 429, {"error": {"code": "TooManyRequests"}}, {"Retry-After": str(self.retry_after)}
+            else:
+                (status, body), headers = self.route(sub_request["method"], sub_request["url"]), {}
+            responses.append({"id": sub_request["id"], "status": status, "headers": headers, "body": body})
+        return {"responses": responses}
+
+    def route(self, method, url):
+        library = self.library
+        parts = urlsplit(url)
+        path = unquote(parts.path)
+        query = parse_qs(parts.query)
+
+        if path == f"/sites/{FAKE_HOSTNAME}:/sites/docs":
+            return 200, {"id": FAKE_SITE_ID}
+        if path == f"/sites/{FAKE_SITE_ID}/drives":
+            return 200, {"value": [{"id": FAKE_DRIVE_ID, "name": "Documents"}]}
+
+        drive_prefix = f"/drives/{FAKE_DRIVE_ID}"
+        if not path.startswith(drive_prefix):
+            return 404, {"error": {"code": "itemNotFound"}}
+        path = path.removeprefix(drive_prefix)
+
+        if path == "/root/delta":
+            token = query.get("token", ["latest"])[0]
+            if token == "latest":
+                value = []
+            else:
+                value = library.delta_since(int(token.removeprefix("v")))
+            return 200, {"value": value, "@odata.deltaLink": f"{GRAPH_BASE_URL}{drive_prefix}/root/delta?token=v{library.version}"}
+
+        if path.startswith("/root:/") and not path.endswith(":/children"):
+            folder_id = library.paths.get(path.removeprefix("/root:/"))
+            if folder_id is None:
+                return 404, {"error": {"code": "itemNotFound"}}
+            return 200, library.serialize(folder_id)
+
+        if path.startswith("/root:/") and path.endswith(":/children"):
+            folder_id = library.paths.get(path.removeprefix("/root:/").removesuffix(":/children"))
+        elif path.startswith("/items/") and path.endswith("/children"):
+            folder_id = path.removeprefix("/items/").removesuffix("/children")
+        else:
+            folder_id = None
+
+        if folder_id not in library.children:
+            return 404, {"error": {"code": "itemNotFound"}}
+
+        skip = int(query.get("$skiptoken", ["0"])[0])
+        child_ids = library.children[folder_id]
+        body = {"value": [library.serialize(item_id) for item_id in child_ids[skip:skip + PAGE_SIZE]]}
+        if skip + PAGE_SIZE < len(child_ids):
+            body["@odata.nextLink"] = f"{GRAPH_BASE_URL}{drive_prefix}/items/{folder_id}/children?$skiptoken={skip + PAGE_SIZE}"
+        return 200, body
+
+    def _response(self, request, status, body, headers):
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(body).encode()
+        response.headers = CaseInsensitiveDict({"Content-Type": "application/json", **headers})
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def fake_session(library, **options):
+    """
+    Return a requests session whose Graph and login traffic is served by FakeGraphAdapter.
+    """
+    adapter = FakeGraphAdapter(library, **options)
+    session = requests.Session()
+    session.mount("https://graph.microsoft.com/", adapter)
+    session.mount("https://login.microsoftonline.com/", adapter)
+    return session, adapter
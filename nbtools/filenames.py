@@ -0,0 +1,93 @@
+"""
+Document filename parsing for NetBox Tools.
+Turns SharePoint file names into the server, application, name and version fields of a
+DocumentationBinding, using the ordered naming rules configured on SharePointConfig.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+
+# Tried in order; the first rule that matches wins
+DEFAULT_FILENAME_PATTERNS = [
+    r'^(?P<application>[A-Za-z0-9]+)-(?P<server>[A-Za-z0-9]+)-(?P<name>[A-Za-z_]+)-V(?P<version>[0-9]+\.[0-9]+\.[0-9]+)',
+    r'^(?P<server>[A-Za-z0-9]+)-(?P<name>[A-Za-z_]+)-V(?P<version>[0-9]+\.[0-9]+\.[0-9]+)',
+]
+PARSE_CACHE_SIZE = 65536
+
+
+class FilenameParser:
+    """
+    Compiled naming rules and file type lookup for one configuration.
+
+    Rules are compiled once; parse() results are memoized per filename for the lifetime
+    of the parser, and get_parser() reuses parsers for unchanged configurations.
+    Returned dicts are shared between callers and must not be modified.
+    """
+
+    def __init__(self, patterns, file_type_mappings):
+        self.rules = [re.compile(pattern) for pattern in patterns]
+        self.file_types = {}
+        for ext, label in file_type_mappings.items():
+            ext = ext.strip().lower()
+            self.file_types[ext if ext.startswith(".") else f".{ext}"] = label
+        self.max_suffix_parts = max((ext.count(".") for ext in self.file_types), default=0)
+        self.parse = lru_cache(maxsize=PARSE_CACHE_SIZE)(self._parse)
+
+    def _parse(self, filename):
+        for rule in self.rules:
+            match = rule.match(filename)
+            if match:
+                return {key: value for key, value in match.groupdict().items() if value is not None}
+        return {}
+
+    def parse_many(self, filenames):
+        """
+        Parse a batch of file names, returning {filename: parsed}.
+        """
+        return {filename: self.parse(filename) for filename in filenames}
+
+    def file_type(self, filename):
+        # Longest configured suffix wins, so ".tar.gz" beats ".gz"
+        parts = filename.lower().rsplit(".", self.max_suffix_parts)
+        for start in range(1, len(parts)):
+            label = self.file_types.get("." + ".".join(parts[start:]))
+            if label:
+                return label
+        return "Unknown"
+
+
+@lru_cache(maxsize=8)
+def _get_parser(patterns, file_type_mappings):
+    return FilenameParser(patterns, dict(file_type_mappings))
+
+
+def get_parser(config):
+    patterns = tuple(config.filename_patterns or DEFAULT_FILENAME_PATTERNS)
+    return _get_parser(patterns, tuple(sorted(config.file_type_mappings.items())))
+
+
+def parser_digest(config):
+    """
+    Digest of the settings that shape parsed rows; stored with the sync state so a change
+    forces a full sync instead of re-parsing only the files that changed.
+    """
+    settings = [config.filename_patterns or DEFAULT_FILENAME_PATTERNS, config.file_type_mappings]
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+
+def validate_patterns(patterns):
+    """
+    Return a list of error messages for naming rules that cannot be used.
+    """
+    errors = []
+    for pattern in patterns:
+        try:
+            compiled = re.compile(pattern)
+        except re.error as e:
+            errors.append(f"Invalid pattern '{pattern}': {e}")
+            continue
+        if "server" not in compiled.groupindex:
+            errors.append(f"Pattern '{pattern}' has no (?P<server>...) group.")
+    return errors
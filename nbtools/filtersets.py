@@ -0,0 +1,49 @@
+"""
+Filter sets for NetBox Tools.
+Shared by the plugin views and the REST API.
+"""
+
+import django_filters
+from django.db.models import Q
+
+from dcim.models import Device
+from virtualization.models import VirtualMachine
+
+from .models import DocumentationBinding
+
+
+class DocumentationBindingFilterSet(django_filters.FilterSet):
+    q = django_filters.CharFilter(method="search", label="Search")
+    device_id = django_filters.ModelMultipleChoiceFilter(field_name="device", queryset=Device.objects.all())
+    virtual_machine_id = django_filters.ModelMultipleChoiceFilter(
+        field_name="virtual_machine", queryset=VirtualMachine.objects.all()
+    )
+    orphaned = django_filters.BooleanFilter(method="filter_orphaned")
+
+    class Meta:
+        model = DocumentationBinding
+        fields = {
+            "category": ["exact"],
+            "server_name": ["exact", "istartswith"],
+            "file_name": ["exact", "icontains"],
+            "application_name": ["exact"],
+            "file_type": ["exact"],
+            "version": ["exact"],
+        }
+
+    def search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        return queryset.filter(
+            Q(server_name__istartswith=value) |
+            Q(file_name__icontains=value) |
+            Q(application_name__istartswith=value)
+        )
+
+    def filter_orphaned(self, queryset, name, value):
+        if value is None:
+            return queryset
+        if value:
+            return queryset.orphaned()
+        return queryset.filter(Q(device__isnull=False) | Q(virtual_machine__isnull=False))
@@ -0,0 +1,332 @@
+"""
+Microsoft Graph client for NetBox Tools.
+Wraps a pooled requests session with the token, site and drive lookups used by the SharePoint sync.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from netbox.plugins import get_plugin_config
+
+GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+LOGIN_BASE_URL = "https://login.microsoftonline.com"
+REQUEST_TIMEOUT = 60
+BATCH_LIMIT = 20
+TOKEN_EXPIRY_MARGIN = 300
+DRIVE_CACHE_TIMEOUT = 60 * 60 * 24
+RETRY_STATUSES = (429, 502, 503, 504)
+THROTTLE_STATUSES = (429, 503)
+BACKOFF_BASE = 1
+BACKOFF_CAP = 60
+
+
+class GraphError(Exception):
+    def __init__(self, message, status_code=None, url=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.url = url
+
+
+def config_cache_key(config, name):
+    """
+    Cache key for Graph data derived from a SharePointConfig; changing any
+    connection setting yields a new key.
+    """
+    contents = "\x1f".join([config.site_url, config.application_id, config.client_id, config.client_secret])
+    digest = hashlib.sha256(contents.encode()).hexdigest()[:32]
+    return f"nbtools:graph:{digest}:{name}"
+
+
+def invalidate_config_cache(config):
+    cache.delete_many([config_cache_key(config, "token"), config_cache_key(config, "drive")])
+
+
+def retry_delay(attempt, retry_after=None):
+    """
+    Seconds to wait before retry number `attempt` (starting at 0). Honors a Retry-After
+    value (seconds or HTTP date) and otherwise uses full-jitter exponential backoff.
+    """
+    if retry_after:
+        try:
+            return max(float(retry_after), 0) + random.uniform(0, BACKOFF_BASE)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                pass
+    return random.uniform(BACKOFF_BASE, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** (attempt + 1)))
+
+
+def _seconds(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency gate for Graph requests. The limit is halved whenever Graph throttles
+    us and grows back by one after a full window of successful requests (AIMD).
+    """
+
+    def __init__(self, limit):
+        self.max_limit = limit
+        self.limit = limit
+        self.lowest = limit
+        self.active = 0
+        self.successes = 0
+        self.condition = threading.Condition()
+
+    def __enter__(self):
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+
+    def __exit__(self, *exc):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def throttled(self):
+        with self.condition:
+            self.limit = max(1, self.limit // 2)
+            self.lowest = min(self.lowest, self.limit)
+            self.successes = 0
+
+    def succeeded(self):
+        with self.condition:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+
+class SyncMetrics:
+    """
+    Thread-safe request counters for one sync, reported on the job result.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "retries": 0, "throttled": 0, "throttle_wait": 0.0}
+
+    def add(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def as_dict(self, limiter=None):
+        with self.lock:
+            data = dict(self.counters)
+        data["throttle_wait"] = round(data["throttle_wait"], 2)
+        if limiter:
+            data["concurrency"] = limiter.limit
+            data["lowest_concurrency"] = limiter.lowest
+        return data
+
+
+class GraphClient:
+    """
+    Thin Graph API client sharing one connection pool between all sync requests.
+    The session is safe to use from the crawler's worker threads; every request goes
+    through the adaptive limiter and is retried on throttling and transient errors.
+    """
+
+    def __init__(self, config, session=None, max_workers=None, max_retries=None):
+        self.config = config
+        self.max_workers = max_workers or get_plugin_config("nbtools", "graph_max_workers")
+        self.max_retries = get_plugin_config("nbtools", "graph_max_retries") if max_retries is None else max_retries
+        if session is None:
+            session = requests.Session()
+            session.mount("https://graph.microsoft.com/", HTTPAdapter(pool_connections=2, pool_maxsize=self.max_workers))
+        self.session = session
+        self.headers = {}
+        self.token_cached = False
+        self.limiter = AdaptiveLimiter(self.max_workers)
+        self.metrics = SyncMetrics()
+
+    def close(self):
+        self.session.close()
+
+    def get_metrics(self):
+        return self.metrics.as_dict(self.limiter)
+
+    def request(self, method, url, **kwargs):
+        if not url.startswith("https://"):
+            url = f"{GRAPH_BASE_URL}{url}"
+        response = self.send(method, url, headers=self.headers, **kwargs)
+
+        # A cached token may have been revoked before it expired
+        if response.status_code == 401 and self.token_cached:
+            self.authenticate(force=True)
+            response = self.send(method, url, headers=self.headers, **kwargs)
+        return response
+
+    def send(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", REQUEST_TIMEOUT)
+        attempt = 0
+        while True:
+            try:
+                with self.limiter:
+                    self.metrics.add("requests")
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                self.backoff(attempt)
+                attempt += 1
+                continue
+
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                if response.status_code < 400:
+                    self.limiter.succeeded()
+                return response
+
+            self.backoff(attempt, response.headers.get("Retry-After"), response.status_code in THROTTLE_STATUSES)
+            attempt += 1
+
+    def backoff(self, attempt, retry_after=None, throttled=False):
+        delay = retry_delay(attempt, retry_after)
+        self.metrics.add("retries")
+        if throttled:
+            self.limiter.throttled()
+            self.metrics.add("throttled")
+            self.metrics.add("throttle_wait", delay)
+        time.sleep(delay)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def get_json(self, url, error="Request failed"):
+        response = self.get(url)
+        if response.status_code != 200:
+            raise GraphError(f"{error}: {response.text}", response.status_code, response.url)
+        return response.json()
+
+    def list_children(self, url):
+        """
+        Return every item of a `/children` listing, following @odata.nextLink pages.
+        """
+        items = []
+        while url:
+            response = self.get(url)
+            if response.status_code != 200:
+                raise GraphError(f"Listing failed: {response.text}", response.status_code, url)
+            payload = response.json()
+            items.extend(payload.get("value", []))
+            url = payload.get("@odata.nextLink")
+        return items
+
+    def batch_get(self, urls):
+        """
+        Send up to BATCH_LIMIT GET requests as one JSON $batch call.
+        Returns the sub-responses ({"status", "body", ...}) in the order of `urls`.
+        """
+        body = {
+            "requests": [
+                {"id": str(index), "method": "GET", "url": url.removeprefix(GRAPH_BASE_URL)}
+                for index, url in enumerate(urls)
+            ]
+        }
+        results = {}
+        attempt = 0
+        while True:
+            response = self.request("POST", "/$batch", json=body)
+            if response.status_code != 200:
+                raise GraphError(f"Batch request failed: {response.text}", response.status_code, response.url)
+
+            retry = []
+            for sub_response in response.json().get("responses", []):
+                results[sub_response.get("id")] = sub_response
+                if sub_response.get("status") in RETRY_STATUSES:
+                    retry.append(sub_response)
+            if not retry or attempt >= self.max_retries:
+                break
+
+            # Throttled sub-requests are sent again as a smaller batch after the longest Retry-After
+            retry_after = max((r.get("headers", {}).get("Retry-After") for r in retry), key=_seconds)
+            self.backoff(attempt, retry_after, any(r.get("status") in THROTTLE_STATUSES for r in retry))
+            retry_ids = {r.get("id") for r in retry}
+            body = {"requests": [request for request in body["requests"] if request["id"] in retry_ids]}
+            attempt += 1
+
+        return [results.get(str(index), {"status": None, "body": None}) for index in range(len(urls))]
+
+    def list_children_batch(self, urls):
+        """
+        Batched variant of list_children(). Each entry of the result is either the item
+        list for that url or the GraphError it failed with.
+        """
+        try:
+            responses = self.batch_get(urls)
+        except GraphError as e:
+            return [GraphError(str(e), e.status_code, url) for url in urls]
+
+        results = []
+        for url, response in zip(urls, responses):
+            body = response.get("body") or {}
+            if response.get("status") != 200:
+                results.append(GraphError(f"Listing failed: {body}", response.get("status"), url))
+                continue
+            try:
+                items = body.get("value", [])
+                if body.get("@odata.nextLink"):
+                    items += self.list_children(body["@odata.nextLink"])
+                results.append(items)
+            except GraphError as e:
+                results.append(e)
+        return results
+
+    def authenticate(self, force=False):
+        config = self.config
+        cache_key = config_cache_key(config, "token")
+        access_token = None if force else cache.get(cache_key)
+        self.token_cached = access_token is not None
+
+        if not access_token:
+            token_url = f"{LOGIN_BASE_URL}/{config.application_id}/oauth2/v2.0/token"
+            token_data = {
+                "grant_type": "client_credentials",
+                "client_id": config.client_id,
+                "client_secret": config.client_secret,
+                "scope": "https://graph.microsoft.com/.default"
+            }
+            token_response = self.send("POST", token_url, data=token_data)
+            if token_response.status_code != 200:
+                raise GraphError(f"Token request failed: {token_response.text}", token_response.status_code, token_url)
+
+            payload = token_response.json()
+            access_token = payload.get("access_token")
+            expires_in = int(payload.get("expires_in", 0))
+            if expires_in > TOKEN_EXPIRY_MARGIN:
+                cache.set(cache_key, access_token, expires_in - TOKEN_EXPIRY_MARGIN)
+
+        self.headers = {"Authorization": f"Bearer {access_token}"}
+
+    def get_documents_drive_id(self):
+        cache_key = config_cache_key(self.config, "drive")
+        drive = cache.get(cache_key)
+        if drive:
+            return drive["drive_id"]
+
+        site_url = self.config.site_url
+        hostname = site_url.replace("https://", "").split("/")[0]
+        path = "/" + "/".join(site_url.replace("https://", "").split("/")[1:])
+        site_id = self.get_json(f"/sites/{hostname}:{path}", error="Site lookup failed").get("id")
+
+        drives = self.get_json(f"/sites/{site_id}/drives", error="Drive lookup failed").get("value", [])
+        documents_drive = next((d for d in drives if d["name"].lower() in ["documents", "shared documents"]), None)
+        if not documents_drive:
+            raise GraphError("Documents library not found.")
+
+        cache.set(cache_key, {"site_id": site_id, "drive_id": documents_drive["id"]}, DRIVE_CACHE_TIMEOUT)
+        return documents_drive["id"]
@@ -1,28 +1,214 @@
-from dcim.models import Device
-from virtualization.models import VirtualMachine
-from datetime import date, timedelta
-from netbox.jobs import Job
-
-class DocumentationReviewJob(Job):
-	description = "Audit Devices & VMs for stale or unreviewed documentation."
-
-	def run(self, data, commit):
-		cutoff = date.today() - timedelta(days=90)
-		pending = []
-
-		for qs, model in ((Device.objects.all(), Device), (VirtualMachine.objects.all(), VirtualMachine)):
-			for obj in qs:
-				last	= obj.cf["latest_update"]
-				status	= obj.cf["reviewed"]
-				if not status or last < cutoff:
-					pending.append({
-						"object_type": 	model._meta.verbose_name.title(),
-						"name":	str(obj),
-						"last_update":	last,
-						"reviewed":	status,
-					})
-
-		self.log_success(f"{len(pending)} items need review.")
-		return pending
+import time
+from datetime import datetime, timedelta
 
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
 
+from core.choices import JobIntervalChoices, JobStatusChoices
+from netbox.jobs import JobRunner, system_job
+
+from .sharepoint import sync_sharepoint
+from .reports import build_overlap_matrix, OVERLAP_MATRIX_REBUILD_DELAY, OVERLAP_MATRIX_REBUILD_KEY
+from .reviews import flagged_q, initialize_review_fields, missing_review_fields_q, review_cutoff, REVIEW_MODELS
+from .utilization import rebuild_prefix_utilization
+
+REVIEW_REPORT_CHUNK_SIZE = 2000
+
+
+class MonitoredJobMixin:
+	"""
+	For background jobs started from a page that waits on them. Jobs are enqueued with an
+	explicit RQ timeout, and a running job that has not saved progress (job.data["updated"])
+	for `stale_after` is presumed left behind by a dead worker.
+	"""
+	job_timeout = 3600
+	stale_after = timedelta(minutes=15)
+
+	@classmethod
+	def enqueue(cls, *args, **kwargs):
+		kwargs.setdefault("job_timeout", cls.job_timeout)
+		return super().enqueue(*args, **kwargs)
+
+	def save_progress(self, data):
+		self.job.data = {**data, "updated": timezone.now().isoformat()}
+		self.job.save(update_fields=["data"])
+
+	@classmethod
+	def is_stale(cls, job):
+		"""
+		True for a job left running by a worker that stopped reporting progress.
+		"""
+		if job.status != JobStatusChoices.STATUS_RUNNING:
+			return False
+		updated = (job.data or {}).get("updated")
+		last_seen = datetime.fromisoformat(updated) if updated else job.started
+		return last_seen is None or timezone.now() - last_seen > cls.stale_after
+
+	@classmethod
+	def expire_if_stale(cls, job):
+		"""
+		Mark a stale job as errored so it no longer counts as running. Returns True if it was stale.
+		"""
+		if not cls.is_stale(job):
+			return False
+		job.terminate(status=JobStatusChoices.STATUS_ERRORED, error="Worker stopped reporting progress.")
+		return True
+
+	@classmethod
+	def active_job(cls):
+		"""
+		Return the queued or running job, if any. Stale running jobs are marked as errored.
+		"""
+		for job in cls.get_jobs().filter(status__in=JobStatusChoices.ENQUEUED_STATE_CHOICES).order_by("-created"):
+			if not cls.expire_if_stale(job):
+				return job
+		return None
+
+
+@system_job(interval=JobIntervalChoices.INTERVAL_DAILY)
+class DocumentationReviewJob(JobRunner):
+	"""
+	Daily audit of Devices & VMs with stale or unreviewed documentation.
+	Stores counts and ids per model on job.data for the reviewer page and dashboard.
+	"""
+
+	class Meta:
+		name = "Documentation Review"
+
+	def run(self, *args, **kwargs):
+		cutoff = review_cutoff()
+		report = {"cutoff": cutoff.isoformat(), "counts": {}, "ids": {}}
+
+		for model, label in REVIEW_MODELS:
+			model_name = model._meta.model_name
+			pks = model.objects.filter(flagged_q(cutoff)).order_by("pk").values_list("pk", flat=True)
+			report["ids"][model_name] = list(pks.iterator(chunk_size=REVIEW_REPORT_CHUNK_SIZE))
+			report["counts"][model_name] = len(report["ids"][model_name])
+			self.logger.info(f"{report['counts'][model_name]} {label} objects need review.")
+
+		report["total"] = sum(report["counts"].values())
+		self.job.data = report
+		self.logger.info(f"{report['total']} items need review.")
+
+	@classmethod
+	def latest_report(cls):
+		"""
+		Return (job, data) of the latest completed review, or (None, None).
+		"""
+		job = cls.get_jobs().filter(status=JobStatusChoices.STATUS_COMPLETED).order_by("-completed").first()
+		if job and job.data:
+			return job, job.data
+		return None, None
+
+
+class SharePointSyncJob(MonitoredJobMixin, JobRunner):
+	"""
+	Runs the SharePoint documentation sync in the background.
+	Progress and the per-path details report are kept on job.data.
+	"""
+	job_timeout = 2 * 3600
+	# Progress is saved per mapped folder, and a large folder can take a while to crawl
+	stale_after = timedelta(minutes=30)
+
+	class Meta:
+		name = "SharePoint Sync"
+
+	def run(self, *args, full=False, **kwargs):
+		def report(done, total, details):
+			self.save_progress({"status": "running", "done": done, "total": total, "details": details})
+
+		result = sync_sharepoint(full=full, progress=report)
+		self.job.data = {**(self.job.data or {}), **result}
+		self.job.data["status"] = result["status"]
+
+		if result["status"] != "success":
+			self.logger.error(f"Sync failed: {result['error']}")
+			raise RuntimeError(result["error"])
+
+		self.logger.info(f"{result['mode'].capitalize()} sync complete. {result['count']} documents cached.")
+
+
+class PrefixUtilizationJob(JobRunner):
+	"""
+	Rebuilds the materialized utilization of every prefix.
+	Signals keep the table current; this repairs it after bulk changes that bypass them.
+	"""
+
+	class Meta:
+		name = "Prefix Utilization Rebuild"
+
+	def run(self, *args, **kwargs):
+		count = rebuild_prefix_utilization()
+		self.job.data = {"count": count}
+		self.logger.info(f"Rebuilt utilization for {count} prefixes.")
+
+
+class OverlapMatrixJob(MonitoredJobMixin, JobRunner):
+	"""
+	Computes the VRF x VRF prefix overlap matrix and caches it for the Prefix Validator.
+	"""
+	job_timeout = 1800
+	# No progress is saved along the way; past its timeout the job cannot still be running
+	stale_after = timedelta(seconds=job_timeout)
+
+	class Meta:
+		name = "Prefix Overlap Matrix"
+
+	def run(self, *args, **kwargs):
+		report = build_overlap_matrix()
+		pairs = sum(report["matrix"].values()) // 2
+		self.job.data = {"key": report["key"], "vrfs": len(report["vrfs"]), "overlaps": pairs}
+		self.logger.info(f"Found {pairs} cross-VRF prefix overlaps across {len(report['vrfs'])} VRFs.")
+
+	@classmethod
+	def schedule_rebuild(cls):
+		"""
+		Schedule a rebuild once the current transaction commits. Further changes before
+		it starts are picked up by the same rebuild.
+		"""
+		def schedule():
+			if cache.add(OVERLAP_MATRIX_REBUILD_KEY, True, OVERLAP_MATRIX_REBUILD_DELAY):
+				cls.enqueue(schedule_at=timezone.now() + timedelta(seconds=OVERLAP_MATRIX_REBUILD_DELAY))
+
+		transaction.on_commit(schedule)
+
+
+class ReviewFieldsJob(MonitoredJobMixin, JobRunner):
+	"""
+	Initializes the documentation review custom fields on Devices and VMs missing them.
+	The checkpoint on job.data lets a later run resume where an interrupted one stopped.
+	"""
+
+	class Meta:
+		name = "Documentation Review Fields"
+
+	def run(self, *args, checkpoint=None, **kwargs):
+		if checkpoint is None:
+			checkpoint = self.previous_checkpoint()
+		total = sum(model.objects.filter(missing_review_fields_q()).count() for model, _ in REVIEW_MODELS)
+		started = time.monotonic()
+
+		def report(checkpoint, processed):
+			elapsed = time.monotonic() - started
+			self.save_progress({
+				"checkpoint": checkpoint,
+				"done": processed,
+				"total": total,
+				"rate": round(processed / elapsed, 1) if elapsed else None,
+			})
+
+		processed = initialize_review_fields(checkpoint=checkpoint, progress=report)
+		elapsed = time.monotonic() - started
+		self.logger.info(f"Initialized review fields on {processed} objects in {elapsed:.1f}s.")
+
+	def previous_checkpoint(self):
+		# Only the run right before this one is resumed; a later completed run supersedes it
+		previous = self.get_jobs().filter(created__lt=self.job.created).order_by("-created").first()
+		interrupted = previous and (
+			previous.status in (JobStatusChoices.STATUS_ERRORED, JobStatusChoices.STATUS_FAILED)
+			or self.is_stale(previous)
+		)
+		if interrupted and previous.data:
+			return previous.data.get("checkpoint")
+		return None
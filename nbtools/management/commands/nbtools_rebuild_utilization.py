@@ -0,0 +1,29 @@
+"""
+Rebuild the materialized prefix utilization table.
+
+    ./manage.py nbtools_rebuild_utilization [--background]
+
+Needed once after installing the plugin and after bulk IPAM changes that bypass signals
+(raw SQL, queryset.update()).
+"""
+
+from django.core.management.base import BaseCommand
+
+from nbtools.jobs import PrefixUtilizationJob
+from nbtools.utilization import rebuild_prefix_utilization
+
+
+class Command(BaseCommand):
+    help = "Rebuild the utilization of every prefix"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--background", action="store_true", help="Enqueue a background job instead")
+
+    def handle(self, *args, **options):
+        if options["background"]:
+            job = PrefixUtilizationJob.enqueue()
+            self.stdout.write(f"Enqueued job {job.pk}")
+            return
+
+        count = rebuild_prefix_utilization()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt utilization for {count} prefixes"))
@@ -0,0 +1,113 @@
+"""
+Benchmark the SharePoint sync against the offline Graph stand-in.
+
+    ./manage.py nbtools_sync_benchmark --categories 300 --files 10 --latency 0.05 --changes 30
+
+Runs a full sync (and optionally an incremental one) inside a transaction that is rolled
+back afterwards, and reports wall time, Graph request counts and database queries.
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from nbtools.fake_graph import FAKE_SITE_URL, SyntheticLibrary, fake_session
+from nbtools.models import SharePointConfig
+from nbtools.sharepoint import sync_sharepoint
+
+
+class Command(BaseCommand):
+    help = "Benchmark the SharePoint sync against a synthetic, offline Graph library"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--categories", type=int, default=50, help="Mapped category folders")
+        parser.add_argument("--subfolders", type=int, default=2, help="Subfolders per category (the first two hold documents)")
+        parser.add_argument("--files", type=int, default=10, help="Files per subfolder")
+        parser.add_argument("--latency", type=float, default=0.05, help="Seconds added to every HTTP round trip")
+        parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+        parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429 responses")
+        parser.add_argument("--workers", type=int, default=None, help="Override the graph_max_workers setting")
+        parser.add_argument("--changes", type=int, default=0, help="Files to change before an extra incremental sync")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+
+    def handle(self, *args, **options):
+        library = SyntheticLibrary(
+            categories=options["categories"],
+            subfolders=options["subfolders"],
+            files=options["files"],
+            seed=options["seed"],
+        )
+        session, adapter = fake_session(
+            library,
+            latency=options["latency"],
+            throttle_rate=options["throttle_rate"],
+            retry_after=options["retry_after"],
+            seed=options["seed"],
+        )
+
+        results = []
+        with transaction.atomic():
+            # The benchmark config replaces the real one only inside this rolled back transaction
+            SharePointConfig.objects.update_or_create(
+                id=1,
+                defaults={
+                    "site_url": FAKE_SITE_URL,
+                    "application_id": "benchmark",
+                    "client_id": "benchmark",
+                    "client_secret": "benchmark",
+                    "folder_mappings": library.folder_mappings(),
+                    "file_type_mappings": {".docx": "Word Document"},
+                }
+            )
+            results.append(self._run("full", adapter, session, full=True, workers=options["workers"]))
+
+            if options["changes"]:
+                library.mutate(options["changes"])
+                results.append(self._run("incremental", adapter, session, full=False, workers=options["workers"]))
+
+            transaction.set_rollback(True)
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for result in results:
+            self.stdout.write(
+                f"{result['mode']:<12} {result['status']:<8} {result['seconds']:>8.2f}s  "
+                f"documents={result['documents']}  http_requests={result['http_requests']}  "
+                f"batched_requests={result['batched_requests']}  retries={result['retries']}  "
+                f"throttle_wait={result['throttle_wait']}s  db_queries={result['db_queries']}"
+            )
+            if result["error"]:
+                self.stderr.write(f"{result['mode']}: {result['error']}")
+
+    def _run(self, mode, adapter, session, full, workers):
+        queries = 0
+
+        def count_queries(execute, sql, params, many, context):
+            nonlocal queries
+            queries += 1
+            return execute(sql, params, many, context)
+
+        before = dict(adapter.counters)
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_queries):
+            result = sync_sharepoint(full=full, session=session, max_workers=workers)
+        elapsed = time.perf_counter() - start
+
+        metrics = result.get("metrics", {})
+        return {
+            "mode": result.get("mode", mode),
+            "status": result["status"],
+            "error": result.get("error"),
+            "seconds": round(elapsed, 3),
+            "documents": result.get("count"),
+            "http_requests": adapter.counters["requests"] - before["requests"],
+            "batched_requests": adapter.counters["batched_requests"] - before["batched_requests"],
+            "retries": metrics.get("retries", 0),
+            "throttle_wait": metrics.get("throttle_wait", 0),
+            "db_queries": queries,
+        }
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nbtools', '0002_add_file_type_mappings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentationbinding',
+            name='item_id',
+            field=models.CharField(max_length=255, null=True, blank=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='SharePointSyncState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('drive_id', models.CharField(max_length=255, unique=True)),
+                ('delta_link', models.TextField(blank=True)),
+                ('folder_mappings', models.JSONField(default=dict)),
+                ('folders', models.JSONField(default=dict)),
+                ('last_synced', models.DateTimeField(null=True, blank=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def remove_duplicates(apps, schema_editor):
+    DocumentationBinding = apps.get_model("nbtools", "DocumentationBinding")
+    keep = (
+        DocumentationBinding.objects.values("server_name", "file_name")
+        .annotate(keep_id=Max("id"))
+        .values_list("keep_id", flat=True)
+    )
+    DocumentationBinding.objects.exclude(id__in=list(keep)).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nbtools', '0003_sharepoint_sync_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicates, reverse_code=migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='documentationbinding',
+            name='last_synced',
+            field=models.DateTimeField(null=True, blank=True),
+        ),
+        migrations.AddConstraint(
+            model_name='documentationbinding',
+            constraint=models.UniqueConstraint(
+                fields=('server_name', 'file_name'),
+                name='nbtools_documentationbinding_unique_server_name_file_name',
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nbtools', '0004_documentationbinding_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharepointconfig',
+            name='current_generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='documentationbinding',
+            name='generation',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RemoveConstraint(
+            model_name='documentationbinding',
+            name='nbtools_documentationbinding_unique_server_name_file_name',
+        ),
+        migrations.AddConstraint(
+            model_name='documentationbinding',
+            constraint=models.UniqueConstraint(
+                fields=('generation', 'server_name', 'file_name'),
+                name='nbtools_documentationbinding_unique_generation_server_name_file_name',
+            ),
+        ),
+    ]
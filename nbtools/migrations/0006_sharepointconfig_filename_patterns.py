@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nbtools', '0005_documentation_generations'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharepointconfig',
+            name='filename_patterns',
+            field=models.JSONField(default=list, blank=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def resolve_objects(apps, schema_editor):
+    DocumentationBinding = apps.get_model("nbtools", "DocumentationBinding")
+    Device = apps.get_model("dcim", "Device")
+    VirtualMachine = apps.get_model("virtualization", "VirtualMachine")
+
+    DocumentationBinding.objects.update(
+        device=models.Subquery(
+            Device.objects.filter(name=models.OuterRef("server_name")).order_by("pk").values("pk")[:1]
+        ),
+        virtual_machine=models.Subquery(
+            VirtualMachine.objects.filter(name=models.OuterRef("server_name")).order_by("pk").values("pk")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dcim', '0003_squashed_0130'),
+        ('virtualization', '0001_squashed_0022'),
+        ('nbtools', '0006_sharepointconfig_filename_patterns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentationbinding',
+            name='device',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='documentation_bindings',
+                to='dcim.device',
+            ),
+        ),
+        migrations.AddField(
+            model_name='documentationbinding',
+            name='virtual_machine',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name='documentation_bindings',
+                to='virtualization.virtualmachine',
+            ),
+        ),
+        migrations.RunPython(resolve_objects, reverse_code=migrations.RunPython.noop),
+    ]
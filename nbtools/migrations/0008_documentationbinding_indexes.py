@@ -0,0 +1,19 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nbtools', '0007_documentationbinding_objects'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='documentationbinding',
+            index=models.Index(fields=['generation', 'category', 'server_name'], name='nbtools_docbind_gen_cat_srv'),
+        ),
+        migrations.AddIndex(
+            model_name='documentationbinding',
+            index=models.Index(fields=['generation', 'file_name'], name='nbtools_docbind_gen_file'),
+        ),
+    ]
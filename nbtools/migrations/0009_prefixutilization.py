@@ -0,0 +1,26 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ipam', '0001_squashed'),
+        ('nbtools', '0008_documentationbinding_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PrefixUtilization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.DecimalField(decimal_places=0, max_digits=40)),
+                ('assigned', models.PositiveIntegerField(default=0)),
+                ('utilization', models.FloatField(db_index=True, default=0)),
+                ('first_free', models.GenericIPAddressField(blank=True, null=True)),
+                ('first_free_azure', models.GenericIPAddressField(blank=True, null=True)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('prefix', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='nbtools_utilization', to='ipam.prefix')),
+            ],
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    GiST index on ipam_prefix.prefix so the database overlap engine's && join can use it.
+    Safe to skip (fake) where the plugin may not touch core tables.
+    """
+
+    dependencies = [
+        ('ipam', '0001_squashed'),
+        ('nbtools', '0009_prefixutilization'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE INDEX IF NOT EXISTS nbtools_ipam_prefix_gist ON ipam_prefix USING gist (prefix inet_ops);",
+            reverse_sql="DROP INDEX IF EXISTS nbtools_ipam_prefix_gist;",
+        ),
+    ]
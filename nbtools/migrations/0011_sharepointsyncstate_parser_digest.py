@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nbtools', '0010_prefix_gist_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharepointsyncstate',
+            name='parser_digest',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
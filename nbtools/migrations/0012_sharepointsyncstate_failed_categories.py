@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('nbtools', '0011_sharepointsyncstate_parser_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sharepointsyncstate',
+            name='failed_categories',
+            field=models.JSONField(default=dict),
+        ),
+    ]
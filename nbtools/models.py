@@ -1,5 +1,8 @@
 from django.db import models
 
+from dcim.models import Device
+from virtualization.models import VirtualMachine
+
 #Sharepoint configuration model, used for sharepoint configuration
 class SharePointConfig(models.Model):
     site_url = models.URLField()
@@ -8,11 +11,42 @@ class SharePointConfig(models.Model):
     client_secret = models.CharField(max_length=255)
     folder_mappings = models.JSONField(default=dict)
     file_type_mappings = models.JSONField(default=dict)
+    filename_patterns = models.JSONField(default=list, blank=True)
+    current_generation = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"SharePoint Config for {self.site_url}"
 
-#Documentation Binding model, used for document caching, test comment
+
+class DocumentationBindingQuerySet(models.QuerySet):
+
+    def current(self):
+        """
+        Restrict to the published sync generation. The pointer is read in the same
+        query, so readers never see rows from a sync that is still running.
+        """
+        generation = SharePointConfig.objects.order_by("pk").values("current_generation")[:1]
+        return self.filter(generation=models.Subquery(generation))
+
+    def orphaned(self):
+        return self.filter(device__isnull=True, virtual_machine__isnull=True)
+
+    def resolve_objects(self):
+        """
+        Point each binding at the Device and VirtualMachine named by its server_name,
+        in one UPDATE.
+        """
+        return self.update(
+            device=models.Subquery(
+                Device.objects.filter(name=models.OuterRef("server_name")).order_by("pk").values("pk")[:1]
+            ),
+            virtual_machine=models.Subquery(
+                VirtualMachine.objects.filter(name=models.OuterRef("server_name")).order_by("pk").values("pk")[:1]
+            ),
+        )
+
+#Documentation Binding model, used for document caching. Rows belong to a sync generation,
+#only the one published on SharePointConfig.current_generation is visible through current()
 class DocumentationBinding(models.Model):
     category = models.CharField(max_length=255)
     server_name = models.CharField(max_length=255, db_index=True)
@@ -21,6 +55,74 @@ class DocumentationBinding(models.Model):
     version = models.CharField(max_length=50)
     file_type = models.CharField(max_length=50)
     sharepoint_url = models.TextField()
+    item_id = models.CharField(max_length=255, null=True, blank=True, db_index=True)
+    last_synced = models.DateTimeField(null=True, blank=True)
+    generation = models.PositiveIntegerField(default=0)
+    device = models.ForeignKey(
+        to="dcim.Device",
+        on_delete=models.SET_NULL,
+        related_name="documentation_bindings",
+        null=True,
+        blank=True,
+    )
+    virtual_machine = models.ForeignKey(
+        to="virtualization.VirtualMachine",
+        on_delete=models.SET_NULL,
+        related_name="documentation_bindings",
+        null=True,
+        blank=True,
+    )
+
+    objects = DocumentationBindingQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["generation", "server_name", "file_name"],
+                name="%(app_label)s_%(class)s_unique_generation_server_name_file_name",
+            ),
+        ]
+        #Back the sortable columns of the documents table, server_name is covered by the constraint
+        indexes = [
+            models.Index(fields=["generation", "category", "server_name"], name="nbtools_docbind_gen_cat_srv"),
+            models.Index(fields=["generation", "file_name"], name="nbtools_docbind_gen_file"),
+        ]
 
     def __str__(self):
         return f"{self.server_name} - {self.file_name} ({self.version})"
+
+#SharePoint sync state, one row per drive, used for incremental (delta) syncs
+class SharePointSyncState(models.Model):
+    drive_id = models.CharField(max_length=255, unique=True)
+    delta_link = models.TextField(blank=True)
+    folder_mappings = models.JSONField(default=dict)
+    parser_digest = models.CharField(max_length=64, blank=True)
+    folders = models.JSONField(default=dict)
+    # Mapped categories the last full sync could not read, with the error
+    failed_categories = models.JSONField(default=dict)
+    last_synced = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"SharePoint Sync State for {self.drive_id}"
+
+#Materialized prefix utilization, kept current by signals and rebuilt by PrefixUtilizationJob
+class PrefixUtilization(models.Model):
+    prefix = models.OneToOneField(
+        to="ipam.Prefix",
+        on_delete=models.CASCADE,
+        related_name="nbtools_utilization",
+    )
+    #IPv6 prefixes can hold up to 2**128 addresses
+    total = models.DecimalField(max_digits=40, decimal_places=0)
+    assigned = models.PositiveIntegerField(default=0)
+    utilization = models.FloatField(default=0, db_index=True)
+    first_free = models.GenericIPAddressField(null=True, blank=True)
+    first_free_azure = models.GenericIPAddressField(null=True, blank=True)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    @property
+    def available(self):
+        return self.total - self.assigned
+
+    def __str__(self):
+        return f"Utilization for {self.prefix}"
@@ -0,0 +1,103 @@
+"""
+Cached IPAM reports for NetBox Tools.
+Builds the VRF × VRF prefix overlap matrix and keeps it in the Django cache under a key
+derived from the latest Prefix and VRF change, so a stale report is never served. The small
+matrix and the per-VRF overlap lists are separate entries, so the matrix is read alone.
+"""
+
+from ipaddress import ip_network
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from ipam.models import Prefix, VRF
+
+from .addressing import OVERLAP_IGNORED_STATUSES, overlapping_pairs
+
+OVERLAP_MATRIX_TIMEOUT = 60 * 60 * 24 * 7
+# Prefix and VRF changes within this many seconds are picked up by one rebuild
+OVERLAP_MATRIX_REBUILD_DELAY = 60
+OVERLAP_MATRIX_REBUILD_KEY = "nbtools:overlap-matrix:rebuild-scheduled"
+
+
+def overlap_matrix_key():
+    # The counts catch deletions, which do not move max(last_updated)
+    parts = []
+    for model in (Prefix, VRF):
+        state = model.objects.aggregate(last_updated=Max("last_updated"), count=Count("pk"))
+        last_updated = state["last_updated"].timestamp() if state["last_updated"] else 0
+        parts.append(f"{last_updated}:{state['count']}")
+    return f"nbtools:overlap-matrix:{':'.join(parts)}"
+
+
+def get_overlap_matrix():
+    """
+    Return the cached overlap matrix for the current prefixes and VRFs, or None.
+    The matrix holds the VRF names and pair counts; see get_vrf_overlaps() for the prefixes.
+    """
+    return cache.get(overlap_matrix_key())
+
+
+def get_vrf_overlaps(report, vrf_id):
+    """
+    Return the cached prefixes and cross-VRF overlaps of one VRF in `report`, or None.
+    """
+    return cache.get(f"{report['key']}:vrf:{vrf_id}")
+
+
+def build_overlap_matrix():
+    """
+    Compute every cross-VRF prefix overlap in one sorted pass and cache the report.
+    Returns the matrix entry.
+    """
+    key = overlap_matrix_key()
+    prefixes = list(
+        Prefix.objects.filter(vrf__isnull=False).exclude(status__in=OVERLAP_IGNORED_STATUSES)
+        .order_by("vrf", "prefix", "pk").values_list("vrf_id", "prefix", "status")
+    )
+
+    report = {
+        "key": key,
+        "generated": timezone.now().isoformat(),
+        "vrfs": {str(pk): name for pk, name in VRF.objects.order_by("name").values_list("pk", "name")},
+        "matrix": {},
+    }
+    # Every VRF gets an entry, so a missing one means it was evicted
+    vrf_overlaps = {vrf_id: {"prefixes": [], "overlaps": {}} for vrf_id in report["vrfs"]}
+    for vrf_id, prefix, status in prefixes:
+        vrf_overlaps.setdefault(str(vrf_id), {"prefixes": [], "overlaps": {}})["prefixes"].append([str(prefix), status])
+
+    blocks = ((index, ip_network(prefix)) for index, (_, prefix, _) in enumerate(prefixes))
+    for first, second in overlapping_pairs(blocks):
+        first_vrf, first_prefix, first_status = prefixes[first]
+        second_vrf, second_prefix, second_status = prefixes[second]
+        if first_vrf == second_vrf:
+            continue
+        for (vrf, prefix), (other_vrf, other_prefix, other_status) in (
+            ((first_vrf, first_prefix), prefixes[second]),
+            ((second_vrf, second_prefix), prefixes[first]),
+        ):
+            overlaps = vrf_overlaps[str(vrf)]["overlaps"].setdefault(str(prefix), [])
+            overlaps.append([str(other_vrf), str(other_prefix), other_status])
+            matrix_key = f"{vrf}:{other_vrf}"
+            report["matrix"][matrix_key] = report["matrix"].get(matrix_key, 0) + 1
+
+    cache.set_many({f"{key}:vrf:{vrf_id}": entry for vrf_id, entry in vrf_overlaps.items()}, OVERLAP_MATRIX_TIMEOUT)
+    cache.set(key, report, OVERLAP_MATRIX_TIMEOUT)
+    return report
+
+
+def matrix_overlaps(vrf_overlaps, secondary_id):
+    """
+    Serve one VRF pair from the cached entry of its primary VRF (see get_vrf_overlaps()),
+    in the shape of addressing.prefix_overlaps().
+    """
+    secondary_id = str(secondary_id)
+    overlaps = vrf_overlaps["overlaps"]
+    for prefix, status in vrf_overlaps["prefixes"]:
+        yield (prefix, status), [
+            (other_prefix, other_status)
+            for other_vrf, other_prefix, other_status in overlaps.get(prefix, [])
+            if other_vrf == secondary_id
+        ]
@@ -0,0 +1,236 @@
+"""
+Documentation review rules for NetBox Tools.
+Expresses the reviewer's flagging as JSON lookups on custom_field_data, so Devices and
+Virtual Machines are filtered, counted and paginated by the database.
+"""
+
+import uuid
+from datetime import date, timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F, Func, JSONField, Q, Value
+from django.db.models.fields.json import KT
+from django.utils import timezone
+
+from core.choices import ObjectChangeActionChoices
+from core.models import ObjectChange
+from dcim.models import Device
+from virtualization.models import VirtualMachine
+
+REVIEW_MODELS = ((Device, "Device"), (VirtualMachine, "Virtual Machine"))
+# Earliest latest_update given to objects when the review fields are initialized
+REVIEW_CUTOFF = date(2025, 1, 1)
+# Documentation not updated within this window is flagged
+REVIEW_MAX_AGE = timedelta(days=90)
+MODELS_BY_NAME = {model._meta.model_name: model for model, _ in REVIEW_MODELS}
+BULK_REVIEW_MESSAGE = "Marked reviewed in bulk; the change data only covers custom fields."
+
+
+class JSONBMerge(Func):
+    """
+    jsonb || jsonb: overwrite the given keys and keep the rest of the document.
+    """
+    arg_joiner = " || "
+    template = "(%(expressions)s)"
+    output_field = JSONField()
+
+
+def selection_key(model, pk):
+    return f"{model._meta.model_name}:{pk}"
+
+
+def parse_selections(selections):
+    """
+    Group "device:12" style keys by model, ignoring anything malformed.
+    """
+    pks = {}
+    for selection in selections:
+        model_name, _, pk = selection.partition(":")
+        if model_name in MODELS_BY_NAME and pk.isdigit():
+            pks.setdefault(MODELS_BY_NAME[model_name], set()).add(int(pk))
+    return pks
+
+
+def review_cutoff():
+    """
+    Date before which an object's latest_update counts as stale, shared by the reviewer
+    page and the scheduled review report.
+    """
+    return timezone.now().date() - REVIEW_MAX_AGE
+
+
+def flagged_q(cutoff):
+    """
+    Objects whose latest_update is missing or before `cutoff`, or that are not reviewed.
+    """
+    return (
+        Q(custom_field_data__latest_update__isnull=True)
+        | Q(custom_field_data__latest_update=None)
+        | Q(custom_field_data__latest_update="")
+        | Q(custom_field_data__latest_update__lt=cutoff.isoformat())
+        | Q(custom_field_data__reviewed__isnull=True)
+        | ~Q(custom_field_data__reviewed=True)
+    )
+
+
+def review_data_present():
+    """
+    True when at least one object carries both review custom fields.
+    """
+    return any(
+        model.objects.filter(
+            custom_field_data__latest_update__isnull=False,
+            custom_field_data__reviewed__in=[True, False],
+        ).exists()
+        for model, _ in REVIEW_MODELS
+    )
+
+
+def review_filter(report=None):
+    """
+    Return (cutoff, ids) selecting the flagged objects: those listed by a stored review
+    report, or every object flagged as of today when there is no report with ids.
+    """
+    if report and "ids" in report:
+        return date.fromisoformat(report["cutoff"]), report["ids"]
+    return review_cutoff(), None
+
+
+def flagged_querysets(cutoff, search_query="", ids=None):
+    """
+    Yield (model, label, queryset) of the flagged objects per review model.
+    `ids` ({model name: [pk, ...]}) limits them to those primary keys.
+    """
+    for model, label in REVIEW_MODELS:
+        queryset = model.objects.filter(flagged_q(cutoff))
+        if ids is not None:
+            queryset = queryset.filter(pk__in=ids.get(model._meta.model_name, []))
+        if search_query:
+            queryset = queryset.filter(name__icontains=search_query)
+        yield model, label, queryset
+
+
+def flagged_objects(cutoff, search_query="", ids=None):
+    """
+    Return one queryset of flagged Devices and VMs as rows of
+    {id, name, type, latest_update, reviewed}, ordered by name.
+    """
+    querysets = []
+    for model, label, queryset in flagged_querysets(cutoff, search_query, ids):
+        querysets.append(
+            queryset.order_by().annotate(
+                type=Value(label),
+                latest_update=KT("custom_field_data__latest_update"),
+                reviewed=KT("custom_field_data__reviewed"),
+            ).values("id", "name", "type", "latest_update", "reviewed")
+        )
+    first, *rest = querysets
+    return first.union(*rest, all=True).order_by("name", "type", "id")
+
+
+def mark_reviewed(selections, request=None):
+    """
+    Mark the selected objects reviewed as of today. Returns the number of objects updated.
+    """
+    return _mark_reviewed(
+        ((model, model.objects.filter(pk__in=pks)) for model, pks in parse_selections(selections).items()),
+        request,
+    )
+
+
+def mark_flagged_reviewed(cutoff, search_query="", ids=None, request=None):
+    """
+    Mark every object matching the reviewer's filter (see flagged_querysets()) reviewed
+    as of today. Returns the number of objects updated.
+    """
+    return _mark_reviewed(
+        ((model, queryset) for model, _, queryset in flagged_querysets(cutoff, search_query, ids)),
+        request,
+    )
+
+
+def _mark_reviewed(querysets, request):
+    """
+    Update each (model, queryset) with one UPDATE and write the changelog entries in bulk.
+    The entries only snapshot custom fields, which is said in their changelog message.
+    """
+    patch = {"reviewed": True, "latest_update": timezone.now().date().isoformat()}
+    user = getattr(request, "user", None)
+    if user is not None and not user.is_authenticated:
+        user = None
+    # Changes made outside a request still share one request id, as NetBox scripts do
+    request_id = getattr(request, "id", None) or uuid.uuid4()
+    count = 0
+
+    with transaction.atomic():
+        for model, queryset in querysets:
+            before = list(queryset.select_for_update().values_list("pk", "name", "custom_field_data"))
+            if not before:
+                continue
+            queryset = model.objects.filter(pk__in=[pk for pk, _, _ in before])
+            count += queryset.update(
+                custom_field_data=JSONBMerge(F("custom_field_data"), Value(patch, output_field=JSONField())),
+                last_updated=timezone.now(),
+            )
+
+            object_type = ContentType.objects.get_for_model(model)
+            ObjectChange.objects.bulk_create([
+                ObjectChange(
+                    user=user,
+                    user_name=user.username if user else "",
+                    request_id=request_id,
+                    action=ObjectChangeActionChoices.ACTION_UPDATE,
+                    changed_object_type=object_type,
+                    changed_object_id=pk,
+                    object_repr=(name or f"{model._meta.verbose_name} {pk}")[:200],
+                    prechange_data={"custom_fields": custom_fields},
+                    postchange_data={"custom_fields": {**custom_fields, **patch}},
+                    message=BULK_REVIEW_MESSAGE,
+                )
+                for pk, name, custom_fields in before
+            ], batch_size=1000)
+
+    return count
+
+
+def missing_review_fields_q():
+    return Q(custom_field_data__latest_update__isnull=True) | Q(custom_field_data__reviewed__isnull=True)
+
+
+def initialize_review_fields(cutoff=REVIEW_CUTOFF, checkpoint=None, progress=None, chunk_size=500):
+    """
+    Fill in latest_update and reviewed on every Device and VM missing either field.
+
+    Primary keys are walked in ascending chunks; after each chunk is written with
+    bulk_update, progress(checkpoint, processed) is called with {model name: last pk},
+    which can be passed back as `checkpoint` to resume. Returns the number of objects updated.
+    """
+    checkpoint = dict(checkpoint or {})
+    recent = review_cutoff()
+    processed = 0
+
+    for model, _ in REVIEW_MODELS:
+        model_name = model._meta.model_name
+        queryset = model.objects.filter(missing_review_fields_q()).only("pk", "created", "custom_field_data").order_by("pk")
+        last_pk = checkpoint.get(model_name, 0)
+
+        while True:
+            objects = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+            if not objects:
+                break
+
+            for obj in objects:
+                created_date = obj.created.date() if obj.created else cutoff
+                obj.custom_field_data["latest_update"] = max(created_date, cutoff).isoformat()
+                obj.custom_field_data["reviewed"] = created_date >= recent
+            with transaction.atomic():
+                model.objects.bulk_update(objects, ["custom_field_data"])
+
+            last_pk = objects[-1].pk
+            checkpoint[model_name] = last_pk
+            processed += len(objects)
+            if progress:
+                progress(checkpoint, processed)
+
+    return processed
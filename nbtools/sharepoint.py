@@ -0,0 +1,475 @@
+"""
+SharePoint document sync for NetBox Tools.
+Crawls the configured Graph folders and caches the files found as DocumentationBinding rows.
+"""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import invalidate_documentation_cache
+from .filenames import get_parser, parser_digest
+from .graph import BATCH_LIMIT, GRAPH_BASE_URL, GraphClient, GraphError
+from .models import SharePointConfig, DocumentationBinding, SharePointSyncState
+
+logger = logging.getLogger("nbtools")
+DOCUMENT_FOLDERS = ["application", "server"]
+BULK_BATCH_SIZE = 500
+
+
+class DeltaResyncRequired(Exception):
+    pass
+
+
+def sync_sharepoint(full=False, progress=None, session=None, max_workers=None):
+    """
+    Update the DocumentationBinding cache from SharePoint.
+
+    Applies the changes recorded since the last sync through a Graph delta query, or
+    rebuilds the whole cache when `full` is set or no usable delta state exists.
+    `progress` is called as progress(done, total, path_results) while the sync runs.
+    `session` and `max_workers` override the Graph client defaults (see fake_graph).
+    """
+    config = SharePointConfig.objects.first()
+    if not config:
+        return {"status": "error", "error": "No configuration found."}
+
+    client = GraphClient(config, session=session, max_workers=max_workers)
+    try:
+        result = _sync(client, config, full, progress)
+    except GraphError as e:
+        result = {"status": "error", "error": str(e)}
+    except Exception as e:
+        logger.exception(f"Error during Graph API sync: {e}")
+        result = {"status": "error", "error": str(e)}
+    finally:
+        client.close()
+
+    result["metrics"] = client.get_metrics()
+    logger.info(f"SharePoint sync metrics: {result['metrics']}")
+    return result
+
+
+def _sync(client, config, full, progress):
+    client.authenticate()
+    drive_id = client.get_documents_drive_id()
+    state = SharePointSyncState.objects.filter(drive_id=drive_id).first()
+
+    usable = (
+        state and state.delta_link
+        and state.folder_mappings == config.folder_mappings
+        and state.parser_digest == parser_digest(config)
+    )
+    if not full and usable:
+        try:
+            return _sync_incremental(client, config, state, progress)
+        except DeltaResyncRequired as e:
+            logger.info(f"Incremental sync not possible, running full sync: {e}")
+
+    return _sync_full(client, config, drive_id, progress)
+
+
+class SharePointCrawler:
+    """
+    Lists the mapped category folders and their document subfolders concurrently.
+
+    Every listing is submitted to one bounded thread pool, so a sync takes about as long
+    as its slowest folder. Subfolder listings are grouped into Graph $batch calls of up to
+    BATCH_LIMIT requests. Categories are yielded as soon as all of their subfolders are
+    done, in completion order; database writes stay on the calling thread.
+    """
+
+    def __init__(self, client, drive_id):
+        self.client = client
+        self.drive_id = drive_id
+
+    def crawl(self, folder_mappings):
+        with ThreadPoolExecutor(max_workers=self.client.max_workers) as executor:
+            pending = {}
+            queued = []
+            listing = 0
+
+            for category_key, path in folder_mappings.items():
+                category = {
+                    "category": category_key,
+                    "path": path,
+                    "url": f"{GRAPH_BASE_URL}/drives/{self.drive_id}/root:/{path}",
+                    "subfolders": [],
+                    "waiting": 0,
+                }
+                pending[executor.submit(self._list_category, category)] = (category, None)
+                listing += 1
+
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    category, batch = pending.pop(future)
+
+                    if batch is None:
+                        listing -= 1
+                        queued.extend((category, subfolder) for subfolder in self._read_category(category, future))
+                        if category["waiting"] == 0:
+                            yield self._finish_category(category)
+                        continue
+
+                    for (category, subfolder), result in zip(batch, future.result()):
+                        self._read_subfolder(subfolder, result)
+                        category["waiting"] -= 1
+                        if category["waiting"] == 0:
+                            yield self._finish_category(category)
+
+                # Send full batches right away, and the remainder once no category listing can add to it
+                while len(queued) >= BATCH_LIMIT or (queued and not listing):
+                    batch, queued = queued[:BATCH_LIMIT], queued[BATCH_LIMIT:]
+                    urls = [subfolder["url"] for _, subfolder in batch]
+                    pending[executor.submit(self.client.list_children_batch, urls)] = (None, batch)
+
+    def _list_category(self, category):
+        # The folder is looked up by path so its id is known even when it has no children
+        folder = self.client.get_json(category["url"], error=f"Folder lookup failed for '{category['path']}'")
+        return folder, self.client.list_children(f"{GRAPH_BASE_URL}/drives/{self.drive_id}/items/{folder['id']}/children")
+
+    def _read_category(self, category, future):
+        path = category["path"]
+        category["folders"] = {}
+        try:
+            folder, items = future.result()
+        except GraphError as e:
+            error_msg = f"Failed to fetch folder '{path}'. Status: {e.status_code}. URL: {category['url']}"
+            category["results"] = [{"path": path, "status": "error", "message": error_msg}]
+            return []
+
+        # Tracked even when empty, so document folders created later are adopted by the delta sync
+        category_folder_id = folder["id"]
+        category["folders"][category_folder_id] = {
+            "category": category["category"],
+            "path": path,
+            "kind": "category",
+            "name": path.rsplit("/", 1)[-1],
+        }
+
+        if not items:
+            warning_msg = f"No items found in folder '{path}'. URL: {category['url']}. Possible reasons: empty folder or incorrect path."
+            category["results"] = [{"path": path, "status": "warning", "message": warning_msg}]
+            return []
+
+        for item in items:
+            if "folder" in item and item["name"].lower() in DOCUMENT_FOLDERS:
+                category["folders"][item["id"]] = {
+                    "category": category["category"],
+                    "path": path,
+                    "kind": "documents",
+                    "name": item["name"],
+                    "parent": category_folder_id,
+                }
+                category["subfolders"].append({
+                    "name": item["name"],
+                    "url": f"{GRAPH_BASE_URL}/drives/{self.drive_id}/items/{item['id']}/children",
+                })
+
+        category["waiting"] = len(category["subfolders"])
+        return category["subfolders"]
+
+    def _read_subfolder(self, subfolder, result):
+        if isinstance(result, GraphError):
+            subfolder["status_code"] = result.status_code
+        else:
+            subfolder["items"] = result
+
+    def _finish_category(self, category):
+        path = category["path"]
+        category["files"] = []
+        if "results" in category:
+            return category
+
+        results = []
+        for subfolder in category["subfolders"]:
+            if "items" not in subfolder:
+                error_msg = f"Failed to fetch subfolder '{subfolder['name']}' under '{path}'. Status: {subfolder['status_code']}. URL: {subfolder['url']}"
+                results.append({"path": path, "status": "error", "message": error_msg})
+                continue
+            category["files"].extend((item, subfolder["name"]) for item in subfolder["items"] if "file" in item)
+
+        found_folders = [subfolder["name"] for subfolder in category["subfolders"]]
+        found_files = [item["name"] for item, _ in category["files"]]
+        if found_files:
+            results.append({
+                "path": path,
+                "status": "success",
+                "message": f"Fetched {len(found_files)} files. Found Folders: {', '.join(found_folders)}. Found Files: {', '.join(found_files)}"
+            })
+        else:
+            results.append({
+                "path": path,
+                "status": "warning",
+                "message": f"No files found. Found Folders: {', '.join(found_folders) if found_folders else 'None'}"
+            })
+        category["results"] = results
+        return category
+
+
+def _sync_full(client, config, drive_id, progress):
+    # Take the delta token before crawling so changes made during the crawl are replayed next time
+    latest_response = client.get(f"/drives/{drive_id}/root/delta?token=latest")
+    delta_link = ""
+    if latest_response.status_code == 200:
+        delta_link = latest_response.json().get("@odata.deltaLink", "")
+    else:
+        logger.warning(f"Could not fetch delta token. Status: {latest_response.status_code}")
+
+    folder_mappings = config.folder_mappings
+    pending = config.current_generation + 1
+
+    # Rows left behind by an earlier sync that never published
+    DocumentationBinding.objects.exclude(generation=config.current_generation).delete()
+
+    writer = BindingWriter(get_parser(config), timezone.now(), pending)
+    total_files = 0
+    reports = {}
+    folders = {}
+
+    crawler = SharePointCrawler(client, drive_id)
+    for done, category in enumerate(crawler.crawl(folder_mappings), start=1):
+        for item, folder_name in category["files"]:
+            writer.add(item, category["category"], folder_name)
+        total_files += len(category["files"])
+        reports[category["category"]] = category["results"]
+        folders.update(category["folders"])
+        if progress:
+            progress(done, len(folder_mappings), _ordered_results(folder_mappings, reports))
+
+    writer.flush()
+    path_results = _ordered_results(folder_mappings, reports)
+
+    # Categories that could not be read completely keep their published rows
+    failed = {key for key, results in reports.items() if any(result["status"] == "error" for result in results)}
+    if failed and failed == set(folder_mappings):
+        DocumentationBinding.objects.filter(generation=pending).delete()
+        return {"status": "error", "error": "No mapped folder could be read.", "mode": "full", "details": path_results}
+    carried = _carry_forward(failed, config.current_generation, pending)
+    # Failed categories stay untracked until a full sync reads them
+    folders = {folder_id: folder for folder_id, folder in folders.items() if folder["category"] not in failed}
+    failed_categories = {
+        key: " ".join(result["message"] for result in reports[key] if result["status"] == "error")
+        for key in failed
+    }
+
+    DocumentationBinding.objects.filter(generation=pending).resolve_objects()
+
+    if total_files == 0 and not carried:
+        DocumentationBinding.objects.filter(generation=pending).delete()
+        return {"status": "error", "error": "No documents found.", "mode": "full", "details": path_results}
+
+    # Readers switch to the new rows in one step; the old generation is dropped afterwards
+    with transaction.atomic():
+        SharePointConfig.objects.filter(pk=config.pk).update(current_generation=pending)
+        SharePointSyncState.objects.update_or_create(
+            drive_id=drive_id,
+            defaults={
+                "delta_link": delta_link,
+                "folder_mappings": folder_mappings,
+                "parser_digest": parser_digest(config),
+                "folders": folders,
+                "failed_categories": failed_categories,
+                "last_synced": timezone.now(),
+            }
+        )
+    invalidate_documentation_cache()
+    DocumentationBinding.objects.filter(generation__lt=pending).delete()
+
+    result = {"status": "success", "mode": "full", "count": total_files + carried, "details": path_results}
+    if failed:
+        result["stale_categories"] = sorted(failed)
+    return result
+
+
+def _carry_forward(categories, generation, pending):
+    """
+    Replace the pending rows of `categories` with copies of their rows in `generation`.
+    Returns the number of rows copied.
+    """
+    if not categories:
+        return 0
+    DocumentationBinding.objects.filter(generation=pending, category__in=categories).delete()
+
+    batch = []
+    previous = DocumentationBinding.objects.filter(generation=generation, category__in=categories).order_by("pk")
+    for binding in previous.iterator(chunk_size=BULK_BATCH_SIZE):
+        binding.pk = None
+        binding.generation = pending
+        batch.append(binding)
+        if len(batch) >= BULK_BATCH_SIZE:
+            # Freshly crawled rows win over copies with the same server and file name
+            DocumentationBinding.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        DocumentationBinding.objects.bulk_create(batch, ignore_conflicts=True)
+    return DocumentationBinding.objects.filter(generation=pending, category__in=categories).count()
+
+
+def _ordered_results(folder_mappings, reports):
+    return [result for key in folder_mappings if key in reports for result in reports[key]]
+
+
+def _sync_incremental(client, config, state, progress):
+    folders = dict(state.folders)
+    failed = state.failed_categories
+    tracked = {folder["path"] for folder in folders.values() if folder["kind"] == "category"}
+    untracked = [
+        path for key, path in config.folder_mappings.items()
+        if path not in tracked and key not in failed
+    ]
+    if untracked:
+        raise DeltaResyncRequired(f"mapped folders not tracked yet: {', '.join(untracked)}")
+
+    changes = []
+    url = state.delta_link
+    pages = 0
+
+    while url:
+        response = client.get(url)
+        if response.status_code == 410:
+            raise DeltaResyncRequired("delta token expired")
+        if response.status_code != 200:
+            raise GraphError(f"Delta query failed. Status: {response.status_code}. {response.text}", response.status_code, url)
+
+        payload = response.json()
+        changes.extend(payload.get("value", []))
+        url = payload.get("@odata.nextLink")
+        delta_link = payload.get("@odata.deltaLink", state.delta_link)
+        pages += 1
+        if progress:
+            progress(pages, pages + (1 if url else 0), [])
+
+    # Folders first, so files in a folder created during this window are picked up
+    for item in changes:
+        if "folder" in item or ("deleted" in item and item["id"] in folders):
+            _apply_folder_change(item, folders)
+
+    updated = []
+    gone = []
+    for item in changes:
+        if "file" not in item and "deleted" not in item:
+            continue
+        folder = folders.get(item.get("parentReference", {}).get("id"))
+        if "deleted" in item or not folder or folder["kind"] != "documents":
+            gone.append(item["id"])
+        else:
+            updated.append((item, folder))
+
+    # Delta changes are small, so they are applied to the published generation in one transaction
+    generation = config.current_generation
+    with transaction.atomic():
+        bindings = DocumentationBinding.objects.filter(generation=generation)
+        # Files of failed categories are untracked, so their kept rows are not touched
+        removed, _ = bindings.filter(item_id__in=gone).exclude(category__in=failed).delete()
+        # Renamed files parse to a new key, so drop their old rows before storing them again
+        bindings.filter(item_id__in=[item["id"] for item, _ in updated]).delete()
+        writer = BindingWriter(get_parser(config), timezone.now(), generation)
+        for item, folder in updated:
+            writer.add(item, folder["category"], folder["name"])
+        writer.flush()
+        bindings.filter(item_id__in=[item["id"] for item, _ in updated]).resolve_objects()
+
+        state.delta_link = delta_link
+        state.folders = folders
+        state.last_synced = timezone.now()
+        state.save()
+    invalidate_documentation_cache()
+
+    message = f"Applied {len(changes)} changes: {len(updated)} documents added or updated, {removed} removed."
+    details = [{"path": "delta", "status": "success", "message": message}]
+    for key, error in failed.items():
+        details.append({
+            "path": config.folder_mappings[key],
+            "status": "error",
+            "message": f"Not synced: the last full sync could not read this folder. {error} "
+                       "Its documents are kept as they were; run a full rebuild once the folder is fixed.",
+        })
+
+    result = {
+        "status": "success",
+        "mode": "incremental",
+        "count": DocumentationBinding.objects.filter(generation=generation).count(),
+        "details": details,
+    }
+    if failed:
+        result["stale_categories"] = sorted(failed)
+    return result
+
+
+def _apply_folder_change(item, folders):
+    known = folders.get(item["id"])
+    parent_id = item.get("parentReference", {}).get("id")
+
+    if known:
+        # Tracked folders are resolved by path, so any rename, move or delete needs a full crawl
+        renamed = item.get("name", known["name"]).lower() != known["name"].lower()
+        moved = known["kind"] == "documents" and parent_id != known["parent"]
+        if "deleted" in item or renamed or moved:
+            raise DeltaResyncRequired(f"folder '{known['path']}' was renamed, moved or deleted")
+        return
+
+    parent = folders.get(parent_id)
+    if parent and parent["kind"] == "category" and item.get("name", "").lower() in DOCUMENT_FOLDERS:
+        folders[item["id"]] = {
+            "category": parent["category"],
+            "path": parent["path"],
+            "kind": "documents",
+            "name": item["name"],
+            "parent": parent_id,
+        }
+
+
+class BindingWriter:
+    """
+    Buffers crawled files and writes them in chunks with bulk_create(update_conflicts=True),
+    keyed on the (generation, server_name, file_name) unique constraint.
+    """
+
+    update_fields = ["category", "version", "file_type", "sharepoint_url", "application_name", "item_id", "last_synced"]
+
+    def __init__(self, parser, synced_at, generation, batch_size=BULK_BATCH_SIZE):
+        self.parser = parser
+        self.synced_at = synced_at
+        self.generation = generation
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, item, category_key, folder_name):
+        self.pending.append((item, category_key, folder_name))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+
+        parsed_names = self.parser.parse_many(item["name"] for item, _, _ in self.pending)
+        bindings = {}
+        for item, category_key, folder_name in self.pending:
+            parsed = parsed_names[item["name"]]
+            binding = DocumentationBinding(
+                file_name=parsed.get("name", item["name"]),
+                server_name=parsed.get("server", ""),
+                category=category_key,
+                version=parsed.get("version", "Unknown"),
+                file_type=self.parser.file_type(item["name"]),
+                sharepoint_url=item["webUrl"],
+                application_name=parsed.get("application", None) or folder_name.capitalize(),
+                item_id=item["id"],
+                last_synced=self.synced_at,
+                generation=self.generation,
+            )
+            # One INSERT ... ON CONFLICT cannot touch the same row twice, so the last file per key wins
+            bindings[(binding.server_name, binding.file_name)] = binding
+
+        DocumentationBinding.objects.bulk_create(
+            bindings.values(),
+            update_conflicts=True,
+            unique_fields=["generation", "server_name", "file_name"],
+            update_fields=self.update_fields,
+        )
+        self.pending = []
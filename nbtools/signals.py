@@ -0,0 +1,104 @@
+"""
+Signal handlers for NetBox Tools.
+"""
+
+from ipaddress import ip_address
+
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from dcim.models import Device
+from ipam.models import IPAddress, Prefix, VRF
+from virtualization.models import VirtualMachine
+
+from .caching import invalidate_documentation_cache
+from .graph import invalidate_config_cache
+from .jobs import OverlapMatrixJob
+from .utilization import address_added, address_removed, update_prefix_utilization
+from .models import SharePointConfig, DocumentationBinding
+
+
+@receiver(pre_save, sender=SharePointConfig)
+def invalidate_previous_graph_cache(sender, instance, **kwargs):
+    if instance.pk:
+        previous = SharePointConfig.objects.filter(pk=instance.pk).first()
+        if previous:
+            invalidate_config_cache(previous)
+
+
+@receiver(post_save, sender=SharePointConfig)
+def invalidate_graph_cache(sender, instance, **kwargs):
+    invalidate_config_cache(instance)
+
+
+@receiver(post_save, sender=Device)
+@receiver(post_save, sender=VirtualMachine)
+def resolve_documentation_bindings(sender, instance, **kwargs):
+    # Covers bindings naming the object and, after a rename, those still pointing at it
+    field = "device" if sender is Device else "virtual_machine"
+    updated = DocumentationBinding.objects.filter(
+        Q(server_name=instance.name) | Q(**{field: instance.pk})
+    ).resolve_objects()
+    if updated:
+        invalidate_documentation_cache()
+
+
+@receiver(post_delete, sender=Device)
+@receiver(post_delete, sender=VirtualMachine)
+def rebind_documentation_bindings(sender, instance, **kwargs):
+    # Another object may carry the same name
+    if DocumentationBinding.objects.filter(server_name=instance.name).resolve_objects():
+        invalidate_documentation_cache()
+
+
+@receiver(pre_save, sender=IPAddress)
+@receiver(pre_save, sender=Prefix)
+def remember_ipam_location(sender, instance, **kwargs):
+    # Only new objects and changed addresses, prefixes or VRFs touch utilization
+    field = "address" if sender is IPAddress else "prefix"
+    instance._nbtools_previous = None
+    if instance.pk:
+        instance._nbtools_previous = sender.objects.filter(pk=instance.pk).values_list(field, "vrf_id").first()
+
+
+def _assigned_elsewhere(instance, host, vrf_id):
+    # Utilization counts distinct hosts, duplicates do not change it
+    return IPAddress.objects.filter(vrf_id=vrf_id, address__net_host=str(host)).exclude(pk=instance.pk).exists()
+
+
+@receiver(post_save, sender=IPAddress)
+def update_saved_ip_address_utilization(sender, instance, created, **kwargs):
+    host, vrf_id = instance.address.ip, instance.vrf_id
+    previous = getattr(instance, "_nbtools_previous", None)
+    if previous and (previous[0].ip, previous[1]) == (host, vrf_id):
+        return
+
+    if previous and not _assigned_elsewhere(instance, previous[0].ip, previous[1]):
+        address_removed(ip_address(str(previous[0].ip)), previous[1])
+    if not _assigned_elsewhere(instance, host, vrf_id):
+        address_added(ip_address(str(host)), vrf_id)
+
+
+@receiver(post_delete, sender=IPAddress)
+def update_deleted_ip_address_utilization(sender, instance, **kwargs):
+    host, vrf_id = instance.address.ip, instance.vrf_id
+    if not _assigned_elsewhere(instance, host, vrf_id):
+        address_removed(ip_address(str(host)), vrf_id)
+
+
+@receiver(post_save, sender=Prefix)
+def update_saved_prefix_utilization(sender, instance, **kwargs):
+    previous = getattr(instance, "_nbtools_previous", None)
+    if previous and (str(previous[0]), previous[1]) == (str(instance.prefix), instance.vrf_id):
+        return
+    update_prefix_utilization([instance])
+
+
+@receiver(post_save, sender=Prefix)
+@receiver(post_delete, sender=Prefix)
+@receiver(post_save, sender=VRF)
+@receiver(post_delete, sender=VRF)
+def rebuild_overlap_matrix(sender, instance, **kwargs):
+    # Any change moves the matrix cache key, so the cached matrix is no longer served
+    OverlapMatrixJob.schedule_rebuild()
@@ -0,0 +1,38 @@
+"""
+Table definitions for NetBox Tools.
+Server-side paginated and sortable tables rendered by the plugin views.
+"""
+
+import django_tables2 as tables
+
+from netbox.tables import BaseTable, columns
+
+from .models import DocumentationBinding
+
+
+class DocumentationBindingTable(BaseTable):
+    server_name = tables.Column(verbose_name="Server")
+    file_name = tables.TemplateColumn(
+        template_code='<a href="{{ record.sharepoint_url }}" target="_blank">{{ value }}</a>',
+        verbose_name="Filename",
+    )
+    version = tables.Column(orderable=False)
+    file_type = tables.Column(verbose_name="File Type", orderable=False)
+    application_name = tables.Column(verbose_name="Type", orderable=False)
+    category = tables.Column()
+    device = tables.Column(linkify=True, orderable=False)
+    virtual_machine = tables.Column(linkify=True, verbose_name="Virtual Machine", orderable=False)
+    last_synced = columns.DateTimeColumn(verbose_name="Last Synced", orderable=False)
+
+    class Meta(BaseTable.Meta):
+        model = DocumentationBinding
+        # Sorting is limited to columns backed by an index within a generation
+        fields = (
+            "server_name", "file_name", "version", "file_type", "application_name", "category",
+            "device", "virtual_machine", "last_synced",
+        )
+        default_columns = (
+            "server_name", "file_name", "version", "file_type", "application_name", "category",
+            "device", "virtual_machine",
+        )
+        order_by = ("category", "server_name")
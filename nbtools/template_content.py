@@ -1,18 +1,23 @@
 from netbox.plugins import PluginTemplateExtension
-from .models import DocumentationBinding
+from .caching import get_grouped_documents
 
-class VirtualMachinePanel(PluginTemplateExtension):
-    model = 'virtualization.virtualmachine'
+class DocumentationPanel(PluginTemplateExtension):
+    binding_field = None
 
     def right_page(self):
         obj = self.context.get('object')
-        documents = DocumentationBinding.objects.filter(server_name=str(obj)).order_by('category', 'file_name')
-        
-        if documents.exists():
-            grouped_docs = {}
-            for doc in documents:
-                grouped_docs.setdefault(doc.category, []).append(doc)
-            return self.render('nbtools/panels/vm_panel.html', extra_context={'grouped_docs': grouped_docs})
+        grouped_docs = get_grouped_documents(self.binding_field, obj)
+
+        if grouped_docs:
+            return self.render('nbtools/panels/documentation_panel.html', extra_context={'grouped_docs': grouped_docs})
         return ''
 
-template_extensions = [VirtualMachinePanel]
+class VirtualMachinePanel(DocumentationPanel):
+    model = 'virtualization.virtualmachine'
+    binding_field = 'virtual_machine'
+
+class DevicePanel(DocumentationPanel):
+    model = 'dcim.device'
+    binding_field = 'device'
+
+template_extensions = [VirtualMachinePanel, DevicePanel]
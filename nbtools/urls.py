@@ -21,13 +21,16 @@ urlpatterns = [
 
     # IP Prefix Checker
     path("ip_prefix_checker/", views.IPPrefixCheckerView.as_view(), name="ip_prefix_checker"),
+    path("ip_prefix_checker/export/", views.ip_prefix_checker_export, name="ip_prefix_checker_export"),
 
     # Prefix Validator
     path("prefix-validator/", views.PrefixValidatorView.as_view(), name="prefix_validator"),
+    path("prefix-validator/export/", views.prefix_validator_export, name="prefix_validator_export"),
 
     # VM Tool
     path("vm-tool/", views.VMToolView.as_view(), name="vm_tool"),
 
     # Documentation Binding
     path("documentation-binding/", views.DocumentationBindingView.as_view(), name="documentation_binding"),
+    path("documentation-binding/sync/<int:pk>/", views.documentation_sync_status, name="documentation_sync_status"),
 ]
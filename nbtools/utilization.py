@@ -0,0 +1,131 @@
+"""
+Prefix utilization maintenance for NetBox Tools.
+Keeps PrefixUtilization rows in step with IPAM so readers get totals, assigned counts
+and the next free address from one indexed query.
+"""
+
+from ipaddress import ip_address, ip_network
+
+from django.db.models import ExpressionWrapper, F, FloatField, IntegerField, Q
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ipam.models import Prefix, VRF
+
+from .addressing import AZURE_RESERVED_OFFSET, GATEWAY_OFFSET, PrefixAllocation, first_free_from, host_range, vrf_allocations
+from .models import PrefixUtilization
+
+UPDATE_FIELDS = ["total", "assigned", "utilization", "first_free", "first_free_azure", "last_updated"]
+FIRST_FREE_OFFSETS = (("first_free", GATEWAY_OFFSET), ("first_free_azure", GATEWAY_OFFSET + AZURE_RESERVED_OFFSET))
+
+
+def _utilization(prefix, allocation):
+    first_free, first_free_azure = (allocation.first_free(offset) for _, offset in FIRST_FREE_OFFSETS)
+    return PrefixUtilization(
+        prefix=prefix,
+        total=allocation.total,
+        assigned=len(allocation.assigned),
+        utilization=100 * len(allocation.assigned) / allocation.total,
+        first_free=str(first_free) if first_free else None,
+        first_free_azure=str(first_free_azure) if first_free_azure else None,
+    )
+
+
+def _store(rows):
+    PrefixUtilization.objects.bulk_create(
+        rows,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["prefix"],
+        update_fields=UPDATE_FIELDS,
+    )
+    return len(rows)
+
+
+def update_prefix_utilization(prefixes):
+    """
+    Recompute the utilization of the given prefixes.
+    """
+    return _store([_utilization(prefix, PrefixAllocation.for_prefix(prefix)) for prefix in prefixes])
+
+
+def rebuild_vrf_utilization(vrf_id):
+    return _store([_utilization(prefix, allocation) for prefix, allocation in vrf_allocations(vrf_id)])
+
+
+def rebuild_prefix_utilization():
+    """
+    Recompute every prefix, one VRF (and the global table) at a time.
+    """
+    return sum(rebuild_vrf_utilization(vrf_id) for vrf_id in [None, *VRF.objects.values_list("pk", flat=True)])
+
+
+def vrf_utilization(vrf_id):
+    """
+    Return the utilization rows of a VRF ordered by prefix, filling in any prefix that
+    has none yet (e.g. before the first rebuild).
+    """
+    rows = PrefixUtilization.objects.filter(prefix__vrf_id=vrf_id).select_related("prefix").order_by("prefix__prefix")
+    if rows.count() != Prefix.objects.filter(vrf_id=vrf_id).count():
+        rebuild_vrf_utilization(vrf_id)
+    return rows
+
+
+def prefix_utilization(prefix):
+    row = PrefixUtilization.objects.filter(prefix=prefix).select_related("prefix").first()
+    if row is None:
+        update_prefix_utilization([prefix])
+        row = PrefixUtilization.objects.select_related("prefix").get(prefix=prefix)
+    return row
+
+
+def _containing(host, vrf_id):
+    return PrefixUtilization.objects.filter(prefix__vrf_id=vrf_id, prefix__prefix__net_contains_or_equals=str(host))
+
+
+def _count_change(delta):
+    # Clamped at zero, so a row that drifted (e.g. after a bulk import) cannot fail an IPAM write
+    assigned = Greatest(F("assigned") + delta, 0, output_field=IntegerField())
+    return {
+        "assigned": assigned,
+        "utilization": ExpressionWrapper(assigned * 100.0 / F("total"), output_field=FloatField()),
+        "last_updated": timezone.now(),
+    }
+
+
+def address_added(host, vrf_id):
+    """
+    Account for a newly assigned host in the prefixes containing it. The first free
+    address is only searched again where the host just took it.
+    """
+    rows = _containing(host, vrf_id)
+    rows.update(**_count_change(1))
+
+    changed = []
+    for row in rows.filter(Q(first_free=str(host)) | Q(first_free_azure=str(host))).select_related("prefix"):
+        network = ip_network(str(row.prefix.prefix))
+        for field, _ in FIRST_FREE_OFFSETS:
+            if getattr(row, field) == str(host):
+                first_free = first_free_from(network, vrf_id, int(host))
+                setattr(row, field, str(first_free) if first_free else None)
+        changed.append(row)
+    PrefixUtilization.objects.bulk_update(changed, ["first_free", "first_free_azure"])
+
+
+def address_removed(host, vrf_id):
+    """
+    Account for a host that is no longer assigned. A freed host before the stored first
+    free address becomes the new one, without a scan.
+    """
+    rows = list(_containing(host, vrf_id).select_related("prefix"))
+    _containing(host, vrf_id).update(**_count_change(-1))
+
+    changed = []
+    for row in rows:
+        first, last = host_range(ip_network(str(row.prefix.prefix)))
+        for field, offset in FIRST_FREE_OFFSETS:
+            current = getattr(row, field)
+            if first + offset <= int(host) <= last and (current is None or int(host) < int(ip_address(current))):
+                setattr(row, field, str(host))
+                changed.append(row)
+    PrefixUtilization.objects.bulk_update(set(changed), ["first_free", "first_free_azure"])
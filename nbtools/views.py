@@ -1,17 +1,28 @@
-from django.shortcuts import render, redirect
-from django.utils import timezone
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.views import View
-from datetime import date, timedelta
 from django.db import transaction
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 
 
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
-from ipaddress import ip_network
+from itertools import chain
 from ipam.models import Prefix, VRF, IPAddress
 
-from .models import SharePointConfig, DocumentationBinding
+from .models import SharePointConfig, DocumentationBinding, PrefixUtilization
+from .jobs import SharePointSyncJob, OverlapMatrixJob, ReviewFieldsJob, DocumentationReviewJob
+from .filtersets import DocumentationBindingFilterSet
+from .tables import DocumentationBindingTable
+from .filenames import DEFAULT_FILENAME_PATTERNS, validate_patterns
+from .addressing import AZURE_RESERVED_OFFSET, PrefixAllocation, prefix_overlaps
+from .utilization import prefix_utilization, vrf_utilization
+from .reports import get_overlap_matrix, get_vrf_overlaps, matrix_overlaps
+from .reviews import flagged_objects, mark_flagged_reviewed, mark_reviewed, review_data_present, review_filter, selection_key
+
+from core.choices import JobStatusChoices
+from core.models import Job
+from utilities.paginator import EnhancedPaginator, get_paginate_count
 
 from office365.sharepoint.client_context import ClientContext
 from office365.runtime.auth.client_credential import ClientCredential
@@ -22,14 +33,56 @@ from django.contrib.contenttypes.models import ContentType
 from django.contrib import messages
 
 import logging
-import time
 import re
 import csv
 import json
-import requests
 
 logger = logging.getLogger("nbtools")
-GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
+
+
+class Echo:
+    """
+    File-like object that hands each written line back instead of buffering it.
+    """
+
+    def write(self, value):
+        return value
+
+
+def stream_export(request, rows, fieldnames, filename):
+    """
+    Stream `rows` (an iterable of dicts) as CSV, or as a JSON array with ?format=json.
+    Rows are serialized one at a time, so reports of any size use constant memory.
+    """
+    if request.GET.get("format") == "json":
+        content = _json_array(rows)
+        response = StreamingHttpResponse(content, content_type="application/json")
+        filename = f"{filename}.json"
+    else:
+        writer = csv.DictWriter(Echo(), fieldnames=fieldnames, extrasaction="ignore")
+        content = chain([writer.writeheader()], (writer.writerow(row) for row in rows))
+        response = StreamingHttpResponse(content, content_type="text/csv")
+        filename = f"{filename}.csv"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def _json_array(rows):
+    yield "["
+    for index, row in enumerate(rows):
+        yield ("," if index else "") + json.dumps(row, default=str)
+    yield "]\n"
+
+
+def review_row(row):
+    """
+    Decorate a flagged_objects() row with its selection key and object URL.
+    """
+    model = Device if row["type"] == "Device" else VirtualMachine
+    row["reviewed"] = row["reviewed"] == "true"
+    row["key"] = selection_key(model, row["id"])
+    row["url"] = reverse(f"{model._meta.app_label}:{model._meta.model_name}", args=[row["id"]])
+    return row
 
 
 def dashboard(request):
@@ -37,7 +90,13 @@ def dashboard(request):
 	context = {
 		"device_count": Device.objects.count(),
 		"vm_count": VirtualMachine.objects.count(),
+		"busiest_prefixes": PrefixUtilization.objects.select_related("prefix", "prefix__vrf").order_by("-utilization")[:10],
 	}
+	review_report = DocumentationReviewJob.latest_report()[1]
+	context["review_report"] = review_report
+	if review_report and "ids" in review_report:
+		oldest = flagged_objects(*review_filter(review_report)).order_by("latest_update", "name")[:10]
+		context["review_oldest"] = [review_row(row) for row in oldest]
 
 	return render(request, "nbtools/dashboard.html", context)
 
@@ -56,14 +115,22 @@ class DocumentationBindingView(View):
                 ".xlsx": "Excel Spreadsheet"
             }
 
-        docs = DocumentationBinding.objects.all().order_by('category', 'server_name')
-        for doc in docs:
-            exists = Device.objects.filter(name=doc.server_name).exists() or VirtualMachine.objects.filter(name=doc.server_name).exists()
-            doc.exists_flag = exists
+        bindings = DocumentationBinding.objects.current().select_related("device", "virtual_machine")
+        filterset = DocumentationBindingFilterSet(request.GET, queryset=bindings)
+        table = DocumentationBindingTable(filterset.qs, user=request.user)
+        table.configure(request)
+
+        sync_job = SharePointSyncJob.active_job() or SharePointSyncJob.get_jobs().order_by("-created").first()
 
         return render(request, self.template_name, {
             "config": config,
-            "docs": docs
+            "table": table,
+            "filterset": filterset,
+            "categories": bindings.order_by("category").values_list("category", flat=True).distinct(),
+            "orphan_count": DocumentationBinding.objects.current().orphaned().count(),
+            "default_filename_patterns": DEFAULT_FILENAME_PATTERNS,
+            "sync_job": sync_job,
+            "sync_running": sync_job is not None and sync_job.status in JobStatusChoices.ENQUEUED_STATE_CHOICES,
         })
 
     def post(self, request):
@@ -85,6 +152,14 @@ class DocumentationBindingView(View):
                 file_type_values = request.POST.getlist("file_type_values[]")
                 file_type_mappings = {k.strip(): v.strip() for k, v in zip(file_type_keys, file_type_values) if k and v}
 
+                # Filename patterns, one regular expression per line, tried in order
+                filename_patterns = [line.strip() for line in request.POST.get("filename_patterns", "").splitlines() if line.strip()]
+                errors = validate_patterns(filename_patterns)
+                if errors:
+                    for error in errors:
+                        messages.error(request, error)
+                    return redirect("plugins:nbtools:documentation_binding")
+
                 SharePointConfig.objects.update_or_create(
                     id=1,
                     defaults={
@@ -93,20 +168,20 @@ class DocumentationBindingView(View):
                         "client_id": client_id,
                         "client_secret": client_secret,
                         "folder_mappings": folder_mappings,
-                        "file_type_mappings": file_type_mappings
+                        "file_type_mappings": file_type_mappings,
+                        "filename_patterns": filename_patterns
                     }
                 )
                 messages.success(request, "Configuration saved successfully.")
 
-            elif action == "sync":
-                messages.info(request, "Syncing with SharePoint...")
-                result = self.sync_sharepoint()
-                if result["status"] == "success":
-                    details = "\n".join([f"{r['status'].upper()}: {r['path']} - {r['message']}" for r in result["details"]])
-                    messages.success(request, f"Sync complete. {result['count']} documents cached.\nDetails:\n{details}")
+            elif action in ("sync", "full_sync"):
+                if SharePointSyncJob.active_job():
+                    messages.warning(request, "A SharePoint sync is already running.")
                 else:
-                    details = "\n".join([f"{r['status'].upper()}: {r['path']} - {r['message']}" for r in result.get("details", [])])
-                    messages.error(request, f"Sync failed: {result['error']}\nDetails:\n{details}")
+                    user = request.user if request.user.is_authenticated else None
+                    full = action == "full_sync"
+                    SharePointSyncJob.enqueue(user=user, full=full)
+                    messages.info(request, f"SharePoint {'full rebuild' if full else 'sync'} queued.")
 
         except Exception as e:
             logger.exception(f"Error in DocumentationBindingView POST: {e}")
@@ -114,143 +189,22 @@ class DocumentationBindingView(View):
 
         return redirect("plugins:nbtools:documentation_binding")
 
-    def sync_sharepoint(self):
-        config = SharePointConfig.objects.first()
-        if not config:
-            return {"status": "error", "error": "No configuration found."}
 
-        DocumentationBinding.objects.all().delete()
-        folder_mappings = config.folder_mappings
-        file_type_mappings = config.file_type_mappings
+def documentation_sync_status(request, pk):
+    job = get_object_or_404(Job, pk=pk, name=SharePointSyncJob.name)
+    SharePointSyncJob.expire_if_stale(job)
+    data = job.data or {}
 
-        try:
-            token_url = f"https://login.microsoftonline.com/{config.application_id}/oauth2/v2.0/token"
-            token_data = {
-                "grant_type": "client_credentials",
-                "client_id": config.client_id,
-                "client_secret": config.client_secret,
-                "scope": "https://graph.microsoft.com/.default"
-            }
-            token_response = requests.post(token_url, data=token_data)
-            if token_response.status_code != 200:
-                return {"status": "error", "error": f"Token request failed: {token_response.text}"}
-
-            access_token = token_response.json().get("access_token")
-            headers = {"Authorization": f"Bearer {access_token}"}
-
-            hostname = config.site_url.replace("https://", "").split("/")[0]
-            path = "/" + "/".join(config.site_url.replace("https://", "").split("/")[1:])
-            site_lookup_url = f"{GRAPH_BASE_URL}/sites/{hostname}:{path}"
-            site_response = requests.get(site_lookup_url, headers=headers)
-            if site_response.status_code != 200:
-                return {"status": "error", "error": f"Site lookup failed: {site_response.text}"}
-
-            site_id = site_response.json().get("id")
-            drives_url = f"{GRAPH_BASE_URL}/sites/{site_id}/drives"
-            drives_response = requests.get(drives_url, headers=headers)
-            if drives_response.status_code != 200:
-                return {"status": "error", "error": f"Drive lookup failed: {drives_response.text}"}
-
-            drives = drives_response.json().get("value", [])
-            documents_drive = next((d for d in drives if d["name"].lower() in ["documents", "shared documents"]), None)
-            if not documents_drive:
-                return {"status": "error", "error": "Documents library not found."}
-
-            drive_id = documents_drive["id"]
-            total_files = 0
-            path_results = []
-
-            for category_key, path in folder_mappings.items():
-                folder_url = f"{GRAPH_BASE_URL}/drives/{drive_id}/root:/{path}:/children"
-                folder_response = requests.get(folder_url, headers=headers)
-                found_folders = []
-                found_files = []
-
-                if folder_response.status_code != 200:
-                    error_msg = f"Failed to fetch folder '{path}'. Status: {folder_response.status_code}. URL: {folder_url}"
-                    path_results.append({"path": path, "status": "error", "message": error_msg})
-                    continue
-
-                items = folder_response.json().get("value", [])
-                if not items:
-                    warning_msg = f"No items found in folder '{path}'. URL: {folder_url}. Possible reasons: empty folder or incorrect path."
-                    path_results.append({"path": path, "status": "warning", "message": warning_msg})
-                    continue
-
-                files_found = 0
-                for item in items:
-                    if "folder" in item and item["name"].lower() in ["application", "server"]:
-                        found_folders.append(item["name"])
-                        subfolder_id = item["id"]
-                        subfolder_url = f"{GRAPH_BASE_URL}/drives/{drive_id}/items/{subfolder_id}/children"
-                        subfolder_response = requests.get(subfolder_url, headers=headers)
-                        if subfolder_response.status_code != 200:
-                            error_msg = f"Failed to fetch subfolder '{item['name']}' under '{path}'. Status: {subfolder_response.status_code}. URL: {subfolder_url}"
-                            path_results.append({"path": path, "status": "error", "message": error_msg})
-                            continue
-
-                        sub_items = subfolder_response.json().get("value", [])
-                        if not sub_items:
-                            continue
-
-                        for sub_item in sub_items:
-                            if "file" in sub_item:
-                                found_files.append(sub_item["name"])
-                                parsed = self.parse_filename(sub_item["name"])
-                                file_type = self.get_file_type(sub_item["name"], file_type_mappings)
-                                DocumentationBinding.objects.update_or_create(
-                                    file_name=parsed.get("name", sub_item["name"]),
-                                    server_name=parsed.get("server", ""),
-                                    defaults={
-                                        "category": category_key,
-                                        "version": parsed.get("version", "Unknown"),
-                                        "file_type": file_type,
-                                        "sharepoint_url": sub_item["webUrl"],
-                                        "application_name": parsed.get("application", None) or item["name"].capitalize()
-                                    }
-                                )
-                                total_files += 1
-                                files_found += 1
-
-                if files_found > 0:
-                    path_results.append({
-                        "path": path,
-                        "status": "success",
-                        "message": f"Fetched {files_found} files. Found Folders: {', '.join(found_folders)}. Found Files: {', '.join(found_files)}"
-                    })
-                else:
-                    path_results.append({
-                        "path": path,
-                        "status": "warning",
-                        "message": f"No files found. Found Folders: {', '.join(found_folders) if found_folders else 'None'}"
-                    })
-
-            if total_files == 0:
-                return {"status": "error", "error": "No documents found.", "details": path_results}
-
-            return {"status": "success", "count": total_files, "details": path_results}
-
-        except Exception as e:
-            logger.exception(f"Error during Graph API sync: {e}")
-            return {"status": "error", "error": str(e)}
-
-    def parse_filename(self, filename):
-        pattern_app = r'^(?P<application>[A-Za-z0-9]+)-(?P<server>[A-Za-z0-9]+)-(?P<name>[A-Za-z_]+)-V(?P<version>[0-9]+\.[0-9]+\.[0-9]+)'
-        pattern_server = r'^(?P<server>[A-Za-z0-9]+)-(?P<name>[A-Za-z_]+)-V(?P<version>[0-9]+\.[0-9]+\.[0-9]+)'
-        match_app = re.match(pattern_app, filename)
-        match_server = re.match(pattern_server, filename)
-        if match_app:
-            return match_app.groupdict()
-        elif match_server:
-            return match_server.groupdict()
-        return {}
-
-    def get_file_type(self, filename, file_type_mappings):
-        filename = filename.lower()
-        for ext, label in file_type_mappings.items():
-            if filename.endswith(ext.lower()):
-                return label
-        return "Unknown"
+    return JsonResponse({
+        "status": job.status,
+        "running": job.status in JobStatusChoices.ENQUEUED_STATE_CHOICES,
+        "done": data.get("done", 0),
+        "total": data.get("total", 0),
+        "count": data.get("count"),
+        "error": data.get("error") or job.error,
+        "details": data.get("details", []),
+        "metrics": data.get("metrics"),
+    })
 
 
 method_decorator(csrf_exempt, name='dispatch')
@@ -281,45 +235,46 @@ class IPPrefixCheckerView(View):
 
         if action == "check_one" and selected_prefix:
             prefix_obj = Prefix.objects.get(id=selected_prefix)
-            results = [self.calculate_prefix_stats(prefix_obj, skip_azure)]
+            results = [self.calculate_prefix_stats(prefix_utilization(prefix_obj), skip_azure)]
 
         elif action == "check_all" and selected_vrf:
-            results = [self.calculate_prefix_stats(pfx, skip_azure) for pfx in prefixes]
+            results = [self.calculate_prefix_stats(row, skip_azure) for row in vrf_utilization(selected_vrf)]
 
         return render(request, self.template_name, {
             "vrfs": vrfs,
             "prefixes": prefixes,
             "selected_vrf": selected_vrf,
+            "azure": skip_azure,
             "results": results
         })
 
-    def calculate_prefix_stats(self, prefix_obj, skip_azure=False):
-        network = ip_network(prefix_obj.prefix)
-        total_addresses = network.num_addresses
-
-        assigned_ips = IPAddress.objects.filter(address__net_contained=prefix_obj.prefix)
-        assigned_set = {str(ip.address.ip) for ip in assigned_ips}
-
-        available_count = total_addresses - len(assigned_set)
-
-        next_available = None
-        hosts = list(network.hosts())
-        start_index = 1 + (5 if skip_azure else 0)
-
-        for ip in hosts[start_index:]:
-            if str(ip) not in assigned_set:
-                next_available = str(ip)
-                break
+    def calculate_prefix_stats(self, utilization, skip_azure=False):
+        prefix_obj = utilization.prefix
+        next_available = utilization.first_free_azure if skip_azure else utilization.first_free
 
         return {
             "prefix": prefix_obj.prefix,
             "url": prefix_obj.get_absolute_url(),
-            "total": total_addresses,
-            "available": available_count,
+            "total": utilization.total,
+            "available": utilization.available,
             "next": next_available or "None available"
         }
 
 
+def ip_prefix_checker_export(request):
+    selected_vrf = request.GET.get("vrf")
+    if not selected_vrf:
+        return HttpResponse("vrf is required.", status=400)
+
+    skip_azure = bool(request.GET.get("azure"))
+    checker = IPPrefixCheckerView()
+    rows = (
+        checker.calculate_prefix_stats(row, skip_azure)
+        for row in vrf_utilization(selected_vrf).iterator(chunk_size=2000)
+    )
+    return stream_export(request, rows, ["prefix", "total", "available", "next"], "prefix_utilization")
+
+
 @method_decorator(csrf_exempt, name='dispatch')
 class PrefixValidatorView(View):
     template_name = "nbtools/prefix_validator.html"
@@ -328,10 +283,20 @@ class PrefixValidatorView(View):
         vrfs = VRF.objects.all()
         return render(request, self.template_name, {
             "vrfs": vrfs,
-            "results": []
+            "results": [],
+            **self._matrix_context(),
         })
 
     def post(self, request):
+        if request.POST.get("action") == "build_matrix":
+            if OverlapMatrixJob.active_job():
+                messages.warning(request, "An overlap matrix build is already queued or running.")
+            else:
+                user = request.user if request.user.is_authenticated else None
+                OverlapMatrixJob.enqueue(user=user)
+                messages.info(request, "Overlap matrix build queued.")
+            return redirect("plugins:nbtools:prefix_validator")
+
         vrfs = VRF.objects.all()
         results = []
 
@@ -339,38 +304,82 @@ class PrefixValidatorView(View):
         secondary_id = request.POST.get("secondary_vrf")
 
         if primary_id and secondary_id:
-            primary_prefixes = Prefix.objects.filter(vrf_id=primary_id).exclude(status__in=["container", "deprecated"])
-            secondary_prefixes = Prefix.objects.filter(vrf_id=secondary_id).exclude(status__in=["container", "deprecated"])
-
-            for pfx1 in primary_prefixes:
-                net1 = ip_network(pfx1.prefix)
-                active_overlaps = []
-                reserved_overlaps = []
-
-                for pfx2 in secondary_prefixes:
-                    net2 = ip_network(pfx2.prefix)
-                    if net1.overlaps(net2):
-                        if pfx2.status == "reserved":
-                            reserved_overlaps.append(f"{pfx2.prefix} (Reserved)")
-                        else:
-                            active_overlaps.append(f"{pfx2.prefix} ({pfx2.status.capitalize()})")
-
-                results.append({
-                    "prefix": f"{pfx1.prefix} ({pfx1.status.capitalize()})",
-                    "active_overlaps": active_overlaps,
-                    "reserved_overlaps": reserved_overlaps
-                })
+            results = list(overlap_rows(primary_id, secondary_id))
 
         return render(request, self.template_name, {
             "vrfs": vrfs,
-            "results": results
+            "results": results,
+            "primary_id": primary_id,
+            "secondary_id": secondary_id,
+            **self._matrix_context(),
         })
 
+    def _matrix_context(self):
+        report = get_overlap_matrix()
+        matrix_job = OverlapMatrixJob.active_job() or OverlapMatrixJob.get_jobs().order_by("-created").first()
+        context = {
+            "matrix": report,
+            "matrix_job": matrix_job,
+            "matrix_running": matrix_job is not None and matrix_job.status in JobStatusChoices.ENQUEUED_STATE_CHOICES,
+        }
+        if report:
+            vrf_ids = list(report["vrfs"])
+            context["matrix_rows"] = [
+                (report["vrfs"][vrf_id], [
+                    None if vrf_id == other_id else report["matrix"].get(f"{vrf_id}:{other_id}", 0)
+                    for other_id in vrf_ids
+                ])
+                for vrf_id in vrf_ids
+            ]
+        return context
+
+
+def overlap_rows(primary_id, secondary_id):
+    """
+    Yield one row per prefix of the primary VRF with the secondary VRF prefixes it overlaps.
+    """
+    # The cached matrix only holds cross-VRF overlaps
+    report = get_overlap_matrix() if str(primary_id) != str(secondary_id) else None
+    vrf_overlaps = get_vrf_overlaps(report, primary_id) if report else None
+    if vrf_overlaps is not None:
+        pairs = matrix_overlaps(vrf_overlaps, secondary_id)
+    else:
+        pairs = prefix_overlaps(primary_id, secondary_id)
+
+    for (prefix, status), overlaps in pairs:
+        active_overlaps = []
+        reserved_overlaps = []
+
+        for other_prefix, other_status in overlaps:
+            if other_status == "reserved":
+                reserved_overlaps.append(f"{other_prefix} (Reserved)")
+            else:
+                active_overlaps.append(f"{other_prefix} ({other_status.capitalize()})")
+
+        yield {
+            "prefix": f"{prefix} ({status.capitalize()})",
+            "active_overlaps": active_overlaps,
+            "reserved_overlaps": reserved_overlaps
+        }
+
+
+def prefix_validator_export(request):
+    primary_id = request.GET.get("primary_vrf")
+    secondary_id = request.GET.get("secondary_vrf")
+    if not primary_id or not secondary_id:
+        return HttpResponse("primary_vrf and secondary_vrf are required.", status=400)
+
+    rows = overlap_rows(primary_id, secondary_id)
+    if request.GET.get("format") != "json":
+        rows = (
+            {**row, "active_overlaps": "; ".join(row["active_overlaps"]), "reserved_overlaps": "; ".join(row["reserved_overlaps"])}
+            for row in rows
+        )
+    return stream_export(request, rows, ["prefix", "active_overlaps", "reserved_overlaps"], "prefix_overlaps")
 
 
 class DocumentationReviewerView(View):
     template_name = "nbtools/documentation_reviewer.html"
-    cutoff_date = date(2025, 1, 1)
 
     def get(self, request):
         return self._render_page(request)
@@ -383,8 +392,11 @@ class DocumentationReviewerView(View):
             if action == "mark_reviewed":
                 self._mark_reviewed(request)
 
+            elif action == "mark_all_reviewed":
+                self._mark_all_reviewed(request, search_query)
+
             elif action == "check_fields":
-                self._check_fields()
+                self._check_fields(request)
 
         except Exception as e:
             logger.exception(f"Error in post action: {e}")
@@ -395,94 +407,42 @@ class DocumentationReviewerView(View):
         reviewed_ids = request.POST.getlist("reviewed_ids")
         logger.debug(f"Marking reviewed for IDs: {reviewed_ids}")
 
-        count = 0
-        today_iso = timezone.now().date().isoformat()
-        for model in [Device, VirtualMachine]:
-            for obj in model.objects.filter(pk__in=reviewed_ids):
-                obj.custom_field_data["reviewed"] = True
-                obj.custom_field_data["latest_update"] = today_iso
-                obj.save()
-                count += 1
+        count = mark_reviewed(reviewed_ids, request)
 
         messages.success(request, f"{count} object{'s' if count != 1 else ''} marked as reviewed.")
 
-    def _check_fields(self):
-        for model in [Device, VirtualMachine]:
-            queryset = model.objects.exclude(
-                custom_field_data__has_key="latest_update"
-            ).union(
-                model.objects.exclude(custom_field_data__has_key="reviewed")
-            )
-            self._set_custom_fields_in_batches(queryset)
-
-    def _set_custom_fields_in_batches(self, queryset):
-        BATCH_SIZE = 100
-        DELAY_BETWEEN_BATCHES = 0.5
-        updates = []
-
-        for obj in queryset:
-            try:
-                created_date = obj.created.date()
-                capped_date = max(created_date, self.cutoff_date)
-
-                obj.custom_field_data["latest_update"] = capped_date.isoformat()
-                obj.custom_field_data["reviewed"] = created_date >= (timezone.now().date() - timedelta(days=90))
+    def _mark_all_reviewed(self, request, search_query):
+        # Same selection as the list, across every page
+        cutoff, ids = review_filter(DocumentationReviewJob.latest_report()[1])
+        count = mark_flagged_reviewed(cutoff, search_query, ids, request)
 
-                updates.append(obj)
-            except Exception as e:
-                logger.exception(f"Error preparing {str(obj)}: {e}")
-
-        total = len(updates)
-        logger.info(f"Starting batch update for {total} objects...")
-
-        for i in range(0, total, BATCH_SIZE):
-            batch = updates[i:i + BATCH_SIZE]
-            try:
-                with transaction.atomic():
-                    for obj in batch:
-                        obj.save()
-                logger.info(f"Batch {i // BATCH_SIZE + 1}: Saved {len(batch)} objects")
-            except Exception as e:
-                logger.exception(f"Error saving batch {i // BATCH_SIZE + 1}: {e}")
-
-            time.sleep(DELAY_BETWEEN_BATCHES)
+        messages.success(request, f"{count} object{'s' if count != 1 else ''} marked as reviewed.")
 
-        logger.info("Batch update complete.")
+    def _check_fields(self, request):
+        if ReviewFieldsJob.active_job():
+            messages.warning(request, "Review fields are already being initialized.")
+            return
+        user = request.user if request.user.is_authenticated else None
+        ReviewFieldsJob.enqueue(user=user)
+        messages.info(request, "Review field initialization queued.")
 
     def _render_page(self, request, search_query=""):
-        flagged_objects = []
-        valid_objects = 0
+        search_query = search_query or request.GET.get("search", "").strip()
+        page = None
         missing_cf_data = False
 
+        review_job, review_report = DocumentationReviewJob.latest_report()
+
         try:
-            for model, label in [(Device, "Device"), (VirtualMachine, "Virtual Machine")]:
-                queryset = model.objects.iterator()
-                if search_query:
-                    queryset = queryset.filter(name__icontains=search_query)
-
-                for obj in queryset:
-                    latest_update = obj.custom_field_data.get("latest_update")
-                    reviewed = obj.custom_field_data.get("reviewed")
-
-                    try:
-                        outdated = date.fromisoformat(str(latest_update)) < self.cutoff_date
-                    except Exception:
-                        outdated = True
-
-                    if latest_update and reviewed in [True, False]:
-                        valid_objects += 1
-
-                    if not latest_update or outdated or reviewed is not True:
-                        flagged_objects.append({
-                            "name": str(obj),
-                            "type": label,
-                            "latest_update": latest_update,
-                            "reviewed": reviewed is True,
-                            "id": obj.pk,
-                            "url": obj.get_absolute_url()
-                        })
-
-            missing_cf_data = valid_objects == 0
+            # The daily report's ids spare the page a scan of every Device and VM
+            cutoff, ids = review_filter(review_report)
+            paginator = EnhancedPaginator(flagged_objects(cutoff, search_query, ids), get_paginate_count(request))
+            page = paginator.get_page(request.GET.get("page"))
+            # Only the rows of the current page are decorated
+            for row in page:
+                review_row(row)
+
+            missing_cf_data = not review_data_present()
         except Exception as e:
             logger.exception(f"Error building flagged list: {e}")
 
@@ -495,7 +455,11 @@ class DocumentationReviewerView(View):
             )
 
         context = {
-            "flagged_objects": flagged_objects,
+            "review_job": review_job,
+            "review_report": review_report,
+            "flagged_objects": page.object_list if page else [],
+            "page": page,
+            "paginator": page.paginator if page else None,
             "search_query": search_query,
             "message": message,
         }
@@ -671,9 +635,7 @@ class VMToolView(View):
                 interface.ip_addresses.clear()
 
             if auto_ip:
-                network = ip_network(prefix.prefix)
-                assigned_ips = {str(ip.address.ip) for ip in IPAddress.objects.filter(address__net_contained=prefix.prefix)}
-                next_ip = next((str(host) for i, host in enumerate(network.hosts()) if i >= 5 and str(host) not in assigned_ips), None)
+                next_ip = PrefixAllocation.for_prefix(prefix).first_free(AZURE_RESERVED_OFFSET)
                 if not next_ip:
                     raise ValueError("No available IP found.")
                 ip_address = f"{next_ip}/32"